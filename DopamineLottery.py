@@ -1,19 +1,38 @@
+import sys
+
+# The frozen (onefile) build has no `python -m`: started with --daemon, the
+# exe runs the headless tracker daemon instead of the window.
+if "--daemon" in sys.argv:
+    from dopamine_core.daemon import main as _daemon_main
+    sys.exit(_daemon_main(["serve"]))
+
+# `--profile-startup`: time every phase and first-time import, print the
+# breakdown once the window is up (also saved to APP_DIR/startup_profile.txt).
+_prof = None
+if "--profile-startup" in sys.argv:
+    from startup_profile import StartupProfiler
+    _prof = StartupProfiler()
+    _prof.install()
+
+def _mark(phase: str) -> None:
+    if _prof:
+        _prof.mark(phase)
+
+# PIL (icon bitmaps), webbrowser (About box), psutil and win32 (backends)
+# are imported on first use, not here.
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import threading
-import os, sys
-import random
-import winsound
-from tracker import load_chances, use_chance, add_chance, track_process, _load_progress
-from PIL import Image, ImageTk
-import win32api
-import win32con
-import win32ui
-import win32gui
-import ctypes
-from ctypes import wintypes
-import time
-import webbrowser
+import os, threading
+from collections import OrderedDict
+_mark("import tkinter")
+from tracker import chances, use_chance_for_roll, schedule_processes, _load_progress, ensure_assets, ui_updates
+import dopamine_core
+from dopamine_core import get_store, get_progress, find_asset, TrackerControl, get_scheduler, get_journal
+from dopamine_core.audio import get_audio, HIGH, NORMAL, LOW
+from dopamine_core.icons import icon_png, icon_cache_key
+from dopamine_core.lottery import draw_one, roll_batch, summarize, load_prize_table, set_prize_table
+from notify import Notifier, JACKPOT, MILESTONE, ROLL
+_mark("import engine + open store")
 
 
 # =============================
@@ -21,22 +40,26 @@ import webbrowser
 # =============================
 
 current_tracking = None
+tracked_targets = []   # every exe credited by the running tracker (primary first)
 tracking_paused = False
 last_button = None
 last_label = None
 track_count = 0
-tracking_thread = None
-tracking_stop_event = None
+tracking_job = None      # scheduler Job running the tracker
+tracking_control = None   # TrackerControl of the running tracker (live settings / stop)
 
 # 🎇 TEST
 TEST_TIME_PER_CHANCE = None  # seconds
 
-APP_DIR = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "DopamineLottery")
-os.makedirs(APP_DIR, exist_ok=True)
+APP_DIR = dopamine_core.APP_DIR
 
-SETTINGS_FILE = os.path.join(APP_DIR, "settings.txt")
-LAST_APP_FILE = os.path.join(APP_DIR, "last_app.txt")
+# chances, progress, settings and last app all live in one SQLite store
+store = get_store()
+audio = get_audio()   # one worker plays every sound (silent off Windows)
 ROLLS_PER_MULTI = 8  # default; overwritten by settings loader
+MULTI_ANIMATE = False  # replay multi-rolls one by one instead of instant summary
+MULTI_RESULT_MS = 10000  # how long the multi-roll summary stays up
+BACKGROUND_TRACKING = False  # on close, hand running targets to the tracker daemon
 VERSION = "0.72"
 COPYRIGHT = "火火火因"
 REPO_URL = "https://github.com/noooa000/DopamineLottery"
@@ -48,37 +71,45 @@ REPO_URL = "https://github.com/noooa000/DopamineLottery"
 # =============================
 
 def _settings_load_rolls() -> int:
-    """Read ROLLS_PER_MULTI from SETTINGS_FILE if present; clamp to [1, 50]."""
+    """Read ROLLS_PER_MULTI from the settings table; clamp to [1, 50]."""
     try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith("ROLLS_PER_MULTI="):
-                        val = int(line.split("=", 1)[1])
-                        return max(1, min(50, val))
+        return max(1, min(50, store.get_int_setting("ROLLS_PER_MULTI", 10)))
+    except Exception:
+        return 10
+
+
+def _settings_load_animate() -> bool:
+    try:
+        return store.get_int_setting("MULTI_ANIMATE", 0) != 0
+    except Exception:
+        return False
+
+
+def _settings_save_animate(on: bool) -> None:
+    try:
+        store.set_setting("MULTI_ANIMATE", int(bool(on)))
+    except Exception:
+        pass
+
+
+def _settings_load_background() -> bool:
+    try:
+        return store.get_int_setting("BACKGROUND_TRACKING", 0) != 0
+    except Exception:
+        return False
+
+
+def _settings_save_background(on: bool) -> None:
+    try:
+        store.set_setting("BACKGROUND_TRACKING", int(bool(on)))
     except Exception:
         pass
-    return 10
 
 
 def _settings_save_rolls(n: int) -> None:
-    """Save only ROLLS_PER_MULTI into SETTINGS_FILE as plain text."""
+    """Persist ROLLS_PER_MULTI into the settings table."""
     try:
-        lines = []
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                lines = f.read().splitlines()
-        found = False
-        for i, line in enumerate(lines):
-            if line.startswith("ROLLS_PER_MULTI="):
-                lines[i] = f"ROLLS_PER_MULTI={n}"
-                found = True
-                break
-        if not found:
-            lines.append(f"ROLLS_PER_MULTI={n}")
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
+        store.set_setting("ROLLS_PER_MULTI", int(n))
     except Exception:
         pass
 
@@ -87,23 +118,33 @@ def _settings_save_rolls(n: int) -> None:
 # Utility
 # =============================
 
-def resource_path(relative_path):
+def _icon_photo(size: int):
+    """icon2.ico at size x size as a Tk PhotoImage.
+
+    The scaled icon is cached as a PNG in APP_DIR (Tk reads PNG natively),
+    so PIL is only imported when the cache is missing or stale.
+    """
     try:
-        base_path = sys._MEIPASS
+        src = find_asset("icon2.ico")
+        cached = os.path.join(APP_DIR, f"icon2_{size}.png")
+        if not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(src):
+            from PIL import Image
+            Image.open(src).resize((size, size)).save(cached, "PNG")
+        return tk.PhotoImage(file=cached)
     except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+        return None
 
 
 # =============================
 # UI Setup
 # =============================
 root = tk.Tk()
+_mark("tk.Tk()")
 
 # window meta
 root.title("Dopamine Lottery")
 try:
-    root.iconbitmap(resource_path("icon2.ico"))
+    root.iconbitmap(find_asset("icon2.ico"))
 except Exception:
     pass  # icon optional
 
@@ -124,14 +165,12 @@ title_bar = tk.Frame(root, bg=BG_COLOR, height=28, bd=0, relief="flat")
 title_bar.pack(fill="x", side="top")
 
 # App icon
-try:
-    icon_img = Image.open(resource_path("icon2.ico")).resize((16, 16))
-    icon_tk_small = ImageTk.PhotoImage(icon_img)
+icon_tk_small = _icon_photo(16)
+if icon_tk_small is not None:
     icon_label_title = tk.Label(title_bar, image=icon_tk_small, bg=BG_COLOR)
-    icon_label_title.pack(side="left", padx=8)
-except Exception:
+else:
     icon_label_title = tk.Label(title_bar, text="🎯", bg=BG_COLOR)
-    icon_label_title.pack(side="left", padx=8)
+icon_label_title.pack(side="left", padx=8)
 
 
 
@@ -145,8 +184,10 @@ def _minimize():
 def _on_restore(_=None):
     root.overrideredirect(True)
     root.update_idletasks()
-    
+
+    # pick up edits made by another process while we were minimized
     try:
+        chances.refresh_if_changed()
         root.after(0, update_chance_label)
     except Exception:
         pass
@@ -159,10 +200,11 @@ try:
 except Exception:
     pass
 
-# Close button
+# Close button: with overrideredirect there is no WM close, so this is the
+# only way out and must take the same path (handoff, flushes) as on_close
 close_btn = tk.Button(
     title_bar, text="✕", bg=BG_COLOR, relief="flat",
-    activebackground=BG_COLOR, command=root.destroy, cursor="hand2"
+    activebackground=BG_COLOR, command=lambda: on_close(), cursor="hand2"
 )
 close_btn.pack(side="right")
 
@@ -175,6 +217,8 @@ settings_mb.pack(side="right", padx=(0, 4))
 
 # shows which mode is active; drives radio checks
 rolls_var = tk.IntVar(value=ROLLS_PER_MULTI)
+animate_var = tk.BooleanVar(value=MULTI_ANIMATE)
+background_var = tk.BooleanVar(value=BACKGROUND_TRACKING)
 
 # Drag window by title bar or icon
 _drag = {"x": 0, "y": 0, "moved": False}
@@ -233,70 +277,67 @@ tracking_label.pack(side="left")
 # Sounds & Small Utils
 # =============================
 
+# These only queue onto the audio worker, so they are safe to call from the Tk thread.
 def play_click_sound():
-    winsound.Beep(800, 100)
+    audio.beep(800, 100, LOW)
 
 
 def play_win_sound():
-    winsound.Beep(1200, 200)
+    audio.beep(1200, 200, NORMAL)
 
 
 def play_jackpot_sound():
-    winsound.Beep(1500, 500)
+    audio.beep(1500, 500, HIGH)
 
 
 def play_fail_sound():
-    winsound.Beep(500, 300)
+    audio.beep(500, 300, NORMAL)
 
 
-def _fmt_hhmmss(seconds: int) -> str:
-    h = seconds // 3600
-    m = (seconds % 3600) // 60
-    s = seconds % 60
-    return f"{h:02d}:{m:02d}:{s:02d}"
+from dopamine_core.tracker import fmt_hhmmss as _fmt_hhmmss
 
 
 # =============================
 # Icon extraction
 # =============================
 
-def extract_icon_image(exe_path):
-    large, small = win32gui.ExtractIconEx(exe_path, 0)
-    if large:
-        hicon = large[0]
-        hdc = win32ui.CreateDCFromHandle(win32gui.GetDC(0))
-        hbmp = win32ui.CreateBitmap()
-        hbmp.CreateCompatibleBitmap(hdc, 32, 32)
-        hdc = hdc.CreateCompatibleDC()
-        hdc.SelectObject(hbmp)
-        win32gui.DrawIconEx(hdc.GetHandleOutput(), 0, 0, hicon, 32, 32, 0, None, win32con.DI_NORMAL)
-        bmpinfo = hbmp.GetInfo()
-        bmpstr = hbmp.GetBitmapBits(True)
-        img = Image.frombuffer(
-            'RGBA',
-            (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-            bmpstr, 'raw', 'BGRA', 0, 1
-        )
-        return img
-    return None
+# Two-level cache: PhotoImages in a small in-memory LRU, backed by the PNG
+# cache in dopamine_core.icons (keyed by exe path + mtime + size).
+ICON_LRU_SIZE = 16
+_icon_lru = OrderedDict()
+
+
+def exe_icon_photo(exe_path):
+    """Tk PhotoImage of the exe's icon, or None. Never touches GDI on a hit."""
+    key = icon_cache_key(exe_path)
+    if key is None:
+        return None
+    if key in _icon_lru:
+        _icon_lru.move_to_end(key)
+        return _icon_lru[key]
+    photo = None
+    try:
+        png = icon_png(exe_path)
+        if png:
+            photo = tk.PhotoImage(file=png)
+    except Exception:
+        photo = None
+    _icon_lru[key] = photo
+    while len(_icon_lru) > ICON_LRU_SIZE:
+        _icon_lru.popitem(last=False)
+    return photo
 
 
 # =============================
 # UI helpers
 # =============================
 
-def show_lottery_popup(text, *, ms=3000, sound=None, title="🎲 Lottery Result"):
-    popup = tk.Toplevel(root)
-    popup.title(title)
-    popup.geometry("400x200")
-    popup.resizable(False, False)
-    popup_x = root.winfo_x() + (root.winfo_width() // 2) - 200
-    popup_y = root.winfo_y() + (root.winfo_height() // 2) - 100
-    popup.geometry(f"+{popup_x}+{popup_y}")
-    tk.Label(popup, text=text, font=("Helvetica", 14), justify="center").pack(expand=True)
-    popup.after(ms, popup.destroy)
-    if sound:
-        threading.Thread(target=sound, daemon=True).start()
+# Popups are pooled toasts (notify.py): reused windows, prioritized, rate-limited.
+notifier = Notifier(root)
+
+
+def show_lottery_popup(text, *, ms=3000, sound=None, title="🎲 Lottery Result", priority=ROLL):
+    return notifier.notify(text, ms=ms, sound=sound, title=title, priority=priority)
 
 
 def show_about():
@@ -314,13 +355,12 @@ def show_about():
     frame.pack(fill="both", expand=True)
 
     # App icon (optional)
-    try:
-        _img = Image.open(resource_path("icon2.ico")).resize((32, 32))
-        _tk = ImageTk.PhotoImage(_img)
+    _tk = _icon_photo(32)
+    if _tk is not None:
         lbl_icon = tk.Label(frame, image=_tk, bg=bg)
         lbl_icon.image = _tk
         lbl_icon.grid(row=0, column=0, rowspan=2, sticky="w")
-    except Exception:
+    else:
         lbl_icon = tk.Label(frame, text="🎲", bg=bg, fg=fg)
         lbl_icon.grid(row=0, column=0, rowspan=2, sticky="w")
 
@@ -333,13 +373,15 @@ def show_about():
 
     # GitHub button with icon 
     try:
-        gh_img = Image.open(resource_path("github.png")).resize((22, 22))
+        from PIL import Image, ImageTk
+        gh_img = Image.open(find_asset("github.png")).resize((22, 22))
         gh_icon = ImageTk.PhotoImage(gh_img)
     except Exception:
         gh_icon = None
 
     def _open_repo():
         try:
+            import webbrowser
             webbrowser.open(REPO_URL)
         except Exception:
             pass
@@ -361,7 +403,7 @@ def show_about():
 
 def _show_or_hide_multi_button():
     """Safely show/hide the multi-roll button (only when Play is visible)."""
-    current = load_chances()
+    current = chances.value
 
     # Is the Play button managed by pack and visible?
     try:
@@ -395,76 +437,79 @@ def _show_or_hide_multi_button():
 
 
 def update_chance_label():
-    current = load_chances()
+    current = chances.value
     chance_label.config(text=f"Chances Left: {current}")
     _show_or_hide_multi_button()
 
 
+_ROLL_SOUNDS = {"win": play_win_sound, "jackpot": play_jackpot_sound, "lose": play_fail_sound}
+
+
+def _describe_roll(r) -> str:
+    if r.outcome == "win":
+        return f"Roll {r.index + 1}: ✅ You won ${r.prize}"
+    if r.outcome == "jackpot":
+        return f"Roll {r.index + 1}: 🎉 JACKPOT! You won ${r.prize}"
+    return f"Roll {r.index + 1}: ✖ Keep working!"
+
+
 def run_lottery():
-    if not use_chance():
+    r = draw_one()
+    if r.outcome == "win":
+        msg, dur = f"You won ${r.prize}!", 3000
+    elif r.outcome == "jackpot":
+        msg, dur = f"🎉 Jackpot!\nYou won 100% of the prize!\n(${r.prize})", 30000
+    else:
+        msg, dur = "Keep working!", 3000
+    # deduct the chance and record the roll in one transaction
+    if not use_chance_for_roll(r.tier or r.outcome, r.prize):
         show_lottery_popup("❌ No lottery chances left!", ms=3000, sound=play_fail_sound)
         return
     play_click_sound()
-    roll = random.random()
-    if roll < 0.49:
-        prize = random.randint(1, 20)
-        msg, snd, dur = f"You won ${prize}!", play_win_sound, 3000
-    elif roll < 0.51:
-        msg, snd, dur = "🎉 Jackpot!\nYou won 100% of the prize!\n($100)", play_jackpot_sound, 30000
-    else:
-        msg, snd, dur = "Keep working!", play_fail_sound, 3000
-    show_lottery_popup(msg, ms=dur, sound=snd)
-    update_chance_label()
+    show_lottery_popup(msg, ms=dur, sound=_ROLL_SOUNDS[r.outcome],
+                       priority=JACKPOT if r.outcome == "jackpot" else ROLL)
 
 
 def run_lottery_multi():
-    """Multi-run uses dynamic ROLLS_PER_MULTI."""
-    def run_all():
-        results = []
-        popup = tk.Toplevel(root)
-        popup.title("🎲 Multi-roll Results")
-        popup.geometry("400x200")
-        popup.resizable(False, False)
-        popup_x = root.winfo_x() + (root.winfo_width() // 2) - 200
-        popup_y = root.winfo_y() + (root.winfo_height() // 2) - 100
-        popup.geometry(f"+{popup_x}+{popup_y}")
-        label = tk.Label(popup, text="", font=("Helvetica", 16), justify="center")
-        label.pack(expand=True, fill="both")
-
-        def show_next_result(index):
-            if index >= ROLLS_PER_MULTI:
-                summary = "\n".join(results)
-                label.config(text=summary, font=("Helvetica", 12), justify="left")
-                return
-            if not use_chance():
-                result = f"Roll {index + 1}: ❌ No more chances!"
-                results.append(result)
-                label.config(text=result)
-                play_fail_sound()
-                popup.after(800, lambda: label.config(text="\n".join(results)))
-                return
+    """Multi-run uses dynamic ROLLS_PER_MULTI.
 
-            roll = random.random()
-            if roll < 0.49:
-                prize = random.randint(1, 20)
-                result = f"Roll {index + 1}: ✅ You won ${prize}"
-                sound_func = play_win_sound
-            elif roll < 0.51:
-                result = f"Roll {index + 1}: 🎉 JACKPOT! You won $100"
-                sound_func = play_jackpot_sound
-            else:
-                result = f"Roll {index + 1}: ✖ Keep working!"
-                sound_func = play_fail_sound
+    All rolls are drawn and paid for up front (one deduction); the popup
+    then shows the summary at once, or replays it roll by roll when
+    MULTI_ANIMATE is on.
+    """
+    rolls = roll_batch(ROLLS_PER_MULTI, chances)
+    results = [_describe_roll(r) for r in rolls]
+    if len(rolls) < ROLLS_PER_MULTI:
+        results.append(f"Roll {len(rolls) + 1}: ❌ No more chances!")
+    totals = summarize(rolls)
+    summary = "\n".join(results + [f"Total: ${totals['total_prize']}"])
+
+    priority = JACKPOT if totals["jackpot"] else ROLL
+    best = ("jackpot" if totals["jackpot"] else "win" if totals["win"] else "lose")
+
+    if not MULTI_ANIMATE:
+        notifier.notify(summary, title="🎲 Multi-roll Results", ms=MULTI_RESULT_MS,
+                        font=("Helvetica", 12), justify="left",
+                        sound=_ROLL_SOUNDS[best], priority=priority)
+        return
 
-            results.append(result)
-            label.config(text=result)
-            threading.Thread(target=sound_func, daemon=True).start()
-            update_chance_label()
-            popup.after(800, lambda: show_next_result(index + 1))
+    toast = notifier.notify(results[0], title="🎲 Multi-roll Results",
+                            ms=800 * len(results) + MULTI_RESULT_MS,
+                            font=("Helvetica", 16), priority=priority)
 
-        show_next_result(0)
+    def show_next_result(index):
+        if toast.done:
+            return   # closed or replaced; nothing left to animate
+        if index >= len(results):
+            toast.update(summary, font=("Helvetica", 12), justify="left")
+            return
+        toast.update(results[index])
+        if toast.visible:
+            sound_func = _ROLL_SOUNDS[rolls[index].outcome] if index < len(rolls) else play_fail_sound
+            sound_func()
+        root.after(800, lambda: show_next_result(index + 1))
 
-    threading.Thread(target=run_all, daemon=True).start()
+    show_next_result(0)
 
 
 # =============================
@@ -477,45 +522,33 @@ def resume_last_tracking():
         last_button.pack_forget(); last_button = None
     if last_label:
         last_label.pack_forget(); last_label = None
-    if os.path.exists(LAST_APP_FILE):
-        with open(LAST_APP_FILE, "r", encoding="utf-8") as f:
-            path = f.read().strip()
-        if os.path.exists(path):
-            exe = os.path.basename(path)
-            icon_img = extract_icon_image(path)
-            if icon_img:
-                last_icon_tk = ImageTk.PhotoImage(icon_img)
-                last_button = tk.Button(resume_frame, image=last_icon_tk,
-                                        command=lambda p=path: start_tracking_from_path(p), cursor="hand2")
-                last_label = tk.Label(resume_frame, text=f"Last tracked: {exe}", font=("Helvetica", 12))
-                last_button.pack(pady=2)
-                last_label.pack(pady=2)
+    try:
+        path = store.get_last_app()
+    except Exception:
+        path = None
+    if path and os.path.exists(path):
+        exe = os.path.basename(path)
+        last_icon_tk = exe_icon_photo(path)
+        if last_icon_tk:
+            last_button = tk.Button(resume_frame, image=last_icon_tk,
+                                    command=lambda p=path: start_tracking_from_path(p), cursor="hand2")
+            last_label = tk.Label(resume_frame, text=f"Last tracked: {exe}", font=("Helvetica", 12))
+            last_button.pack(pady=2)
+            last_label.pack(pady=2)
 
 
 def show_cheer_popup():
-    popup = tk.Toplevel(root)
-    popup.title("🎉 Celebration!")
-    popup.geometry("200x150")
-    popup.resizable(False, False)
-    popup_x = root.winfo_x() + (root.winfo_width() // 2) - 100
-    popup_y = root.winfo_y() + (root.winfo_height() // 2) - 75
-    popup.geometry(f"+{popup_x}+{popup_y}")
-    tk.Label(popup, text="🎉", font=("Helvetica", 60)).pack(expand=True)
-    popup.after(2500, popup.destroy)  # short = snappier UI
-
-    # play asynchronously so Stop stays responsive
-    threading.Thread(
-        target=lambda: winsound.PlaySound(
-            resource_path("cheer.wav"),
-            winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT
-        ),
-        daemon=True
-    ).start()
+    # key="cheer": a burst of milestones extends one toast instead of stacking
+    notifier.notify("🎉", title="🎉 Celebration!", size=(200, 150), font=("Helvetica", 60),
+                    ms=2500, priority=MILESTONE, key="cheer",
+                    sound=lambda: audio.play("cheer", HIGH))   # queued on the audio worker
 
 
 def toggle_pause():
     global tracking_paused
     tracking_paused = not tracking_paused
+    if tracking_control:
+        tracking_control.set_paused(tracking_paused)   # takes effect now, not next tick
     pause_button.config(text=("▶ Resume Tracking" if tracking_paused else "⏸ Pause Tracking"))
     if not stop_button.winfo_ismapped():
         stop_button.pack(pady=2)
@@ -525,37 +558,43 @@ def toggle_pause():
 # Tracking start/stop
 # =============================
 
-def _start_tracker(exe_name: str):
-    """Start/restart the background tracker thread with instant UI updates."""
-    global tracking_thread, tracking_stop_event
+def _start_tracker(targets):
+    """Start the tracker job on the shared scheduler, or retarget the running one.
 
-    # stop any previous tracker cleanly
-    if tracking_thread and tracking_thread.is_alive():
-        try:
-            tracking_stop_event.set()
-            tracking_thread.join(timeout=1.5)
-        except Exception:
-            pass
+    `targets` is a list of exe names; one job scans for all of them.
+    A running tracker picks the new list up at its next tick (no restart).
+    """
+    global tracking_control
+
+    if tracking_control and not (tracking_job and tracking_job.done):
+        tracking_control.set_targets(targets)   # running, or about to start
+        return
 
-    tracking_stop_event = threading.Event()
-    tracking_thread = threading.Thread(
-        target=track_process,
-        args=(
-            exe_name,
-            tracked_time_label,
-            lambda: tracking_paused,
-            show_cheer_popup,
-            TEST_TIME_PER_CHANCE,
-            tracking_stop_event,
-        ),
-        # push instant UI update when a chance is added
-        kwargs=dict(
-            rolls_per_multi=ROLLS_PER_MULTI,
-            on_chance_update=update_chance_label,
-        ),
-        daemon=True
+    control = tracking_control = TrackerControl()
+
+    # only one process credits time: take tracking back from the daemon
+    # first. That is socket IPC (the daemon waits for its final flush), so
+    # it runs on a worker and the job starts from the UI pump afterwards.
+    def reclaim():
+        _reclaim_from_daemon()
+        ui_updates.post(lambda: _schedule_tracker(control))
+    threading.Thread(target=reclaim, name="reclaim", daemon=True).start()
+
+
+def _schedule_tracker(control):
+    global tracking_job
+    if control is not tracking_control:
+        return   # stopped (or restarted) while the daemon let go
+    # chance label updates arrive via the chances subscription
+    tracking_job = schedule_processes(
+        list(tracked_targets),
+        tracked_time_label,
+        lambda: tracking_paused,
+        show_cheer_popup,
+        TEST_TIME_PER_CHANCE,
+        rolls_per_multi=ROLLS_PER_MULTI,
+        control=control,
     )
-    tracking_thread.start()
 
 
 def start_tracking_from_path(path: str):
@@ -568,6 +607,7 @@ def start_tracking_from_path(path: str):
 
     exe = os.path.basename(path)
     current_tracking = exe
+    tracked_targets[:] = [exe]
     tracking_label.config(text=f"Tracking: {exe}", fg="green")
 
     # Prefill UI with carry-over seconds
@@ -579,15 +619,13 @@ def start_tracking_from_path(path: str):
 
     # Save last app path
     try:
-        with open(LAST_APP_FILE, "w", encoding="utf-8") as f:
-            f.write(path)
+        store.set_last_app(path)
     except Exception:
         pass
 
     # Set icon
-    icon_img = extract_icon_image(path)
-    if icon_img:
-        icon_tk = ImageTk.PhotoImage(icon_img)
+    icon_tk = exe_icon_photo(path)
+    if icon_tk:
         icon_label.config(image=icon_tk, text="")
         icon_label.image = icon_tk
     else:
@@ -595,7 +633,7 @@ def start_tracking_from_path(path: str):
         icon_label.image = None
 
     # Start sound (short)
-    winsound.Beep(600, 120)
+    audio.beep(600, 120, LOW)
 
     # Hide selection & play buttons
     for btn in (track_button, play_button, play_multi_button):
@@ -611,8 +649,10 @@ def start_tracking_from_path(path: str):
         pause_button.pack(pady=5)
     if not stop_button.winfo_ismapped():
         stop_button.pack(pady=2)
+    if not add_button.winfo_ismapped():
+        add_button.pack(pady=2)
 
-    _start_tracker(exe)
+    _start_tracker(tracked_targets)
 
 
 def start_tracking():
@@ -632,6 +672,7 @@ def start_tracking():
 
     exe = os.path.basename(filepath)
     current_tracking = exe
+    tracked_targets[:] = [exe]
     tracking_label.config(text=f"Tracking: {exe}", fg="green")
 
     # Prefill UI with carry-over seconds
@@ -642,9 +683,8 @@ def start_tracking():
         pass
 
     # Set icon
-    icon_img = extract_icon_image(filepath)
-    if icon_img:
-        icon_tk = ImageTk.PhotoImage(icon_img)
+    icon_tk = exe_icon_photo(filepath)
+    if icon_tk:
         icon_label.config(image=icon_tk, text="")
         icon_label.image = icon_tk
     else:
@@ -652,7 +692,7 @@ def start_tracking():
         icon_label.image = None
 
     # Short start sound
-    winsound.Beep(600, 120)
+    audio.beep(600, 120, LOW)
 
     # Hide selection & play buttons
     for btn in (track_button, play_button, play_multi_button):
@@ -668,42 +708,53 @@ def start_tracking():
         pause_button.pack(pady=5)
     if not stop_button.winfo_ismapped():
         stop_button.pack(pady=2)
+    if not add_button.winfo_ismapped():
+        add_button.pack(pady=2)
 
     # Persist last app path
     try:
-        with open(LAST_APP_FILE, "w", encoding="utf-8") as f:
-            f.write(filepath)
+        store.set_last_app(filepath)
     except Exception:
         pass
 
-    _start_tracker(exe)
+    _start_tracker(tracked_targets)
+
+
+def add_tracking():
+    """Credit another exe alongside the current one (same tracker thread)."""
+    if not current_tracking:
+        return
+    filepath = filedialog.askopenfilename(
+        title="Select Another EXE to Track",
+        filetypes=[("Executable Files", "*.exe")]
+    )
+    if not filepath:
+        return
+    exe = os.path.basename(filepath)
+    if exe.lower() in (t.lower() for t in tracked_targets):
+        return
+    tracked_targets.append(exe)
+    tracking_label.config(text=f"Tracking: {', '.join(tracked_targets)}", fg="green")
+    _start_tracker(tracked_targets)
 
 
 def stop_tracking():
-    """Stop tracker thread and restore UI fast."""
-    global tracking_paused, current_tracking, tracking_thread, tracking_stop_event
+    """Stop the tracker job and restore UI fast."""
+    global tracking_paused, current_tracking, tracking_job, tracking_control
 
     tracking_paused = False
     current_tracking = None
+    tracked_targets.clear()
 
-    if tracking_stop_event:
+    if tracking_control:
         try:
-            tracking_stop_event.set()
+            tracking_control.stop()   # the job flushes progress and ends at its next tick
         except Exception:
             pass
+    tracking_control = None
+    tracking_job = None  # detach from UI immediately
 
-    t = tracking_thread
-    tracking_thread = None  # detach from UI immediately
-
-    if t and t.is_alive():
-        def _join_bg(th):
-            try:
-                th.join(timeout=5)
-            except Exception:
-                pass
-        threading.Thread(target=_join_bg, args=(t,), daemon=True).start()
-
-    winsound.PlaySound(None, winsound.SND_PURGE)
+    audio.stop()
 
     tracking_label.config(text="Tracking: None", fg="gray")
     tracked_time_label.config(text="Tracked Time: 00:00:00")
@@ -713,6 +764,8 @@ def stop_tracking():
         pause_button.pack_forget()
     if stop_button.winfo_ismapped():
         stop_button.pack_forget()
+    if add_button.winfo_ismapped():
+        add_button.pack_forget()
 
     # Hide multi to avoid pack-after errors when Play isn't packed yet
     try:
@@ -730,17 +783,101 @@ def stop_tracking():
 
 
 def on_close():
+    handoff = list(tracked_targets) if (BACKGROUND_TRACKING and current_tracking
+                                        and not tracking_paused) else []
+    job = tracking_job
     stop_tracking()
+    if job:
+        job.wait(timeout=2)   # final progress flush and journal records land first
+    journal = get_journal()
+    if journal:
+        journal.close()
+    if handoff:
+        root.withdraw()   # starting the daemon can take a moment; nothing left to show
+        _handoff_to_daemon(handoff)
+    audio.close()
     root.destroy()
 
 
 # =============================
-# Auto-refresh chances
+# Background daemon (dopamine_core.daemon)
+# =============================
+
+def _handoff_to_daemon(targets) -> bool:
+    """Keep earning after the window closes: the daemon tracks `targets`."""
+    try:
+        from dopamine_core import daemon
+        client = daemon.spawn()
+        if client is None:
+            return False
+        with client:
+            client.request("start", targets=list(targets), rolls_per_multi=ROLLS_PER_MULTI,
+                           time_required=TEST_TIME_PER_CHANCE)
+        return True
+    except Exception:
+        return False
+
+
+def _reclaim_from_daemon():
+    """Stop the daemon's tracking (if any) and pick up what it earned (worker thread)."""
+    try:
+        from dopamine_core import daemon
+        client = daemon.connect()
+        if client is None:
+            return
+        with client:
+            if client.request("status")["running"]:
+                client.request("stop")
+        get_progress().reload()
+        chances.refresh_if_changed()
+    except Exception:
+        pass
+
+
+def _show_daemon_status():
+    """After a handoff the daemon may still be tracking: show what it reports."""
+    def query():
+        try:
+            from dopamine_core import daemon
+            client = daemon.connect()
+            if client is None:
+                return
+            with client:
+                status = client.request("status")
+            chances.refresh_if_changed()   # it kept awarding while the window was closed
+        except Exception:
+            return
+        if status.get("running"):
+            ui_updates.post(lambda: _show_background_tracking(status), "daemon_status")
+    threading.Thread(target=query, name="daemon-status", daemon=True).start()
+
+
+def _show_background_tracking(status):
+    if tracking_control:
+        return   # tracking was started here meanwhile (and took over)
+    state = "paused" if status.get("paused") else "in background"
+    tracking_label.config(text=f"Tracking {state}: {', '.join(status.get('targets', []))}", fg="blue")
+    tracked_time_label.config(text=f"Tracked Time: {_fmt_hhmmss(status.get('tracked_seconds', 0))}")
+
+
+# =============================
+# Chance updates (push, no polling)
 # =============================
 
-def auto_refresh_chance():
-    update_chance_label()
-    root.after(5000, auto_refresh_chance)  # every 5 sec
+def _on_chances_changed(_balance):
+    # may fire on the tracker thread; the pump runs it on the Tk thread
+    ui_updates.post(update_chance_label, "chance_label")
+
+
+# =============================
+# UI update pump
+# =============================
+UI_PUMP_MS = 50   # worker -> Tk messages are applied at most this late
+
+
+def _pump_ui_updates():
+    ui_updates.drain()
+    root.after(UI_PUMP_MS, _pump_ui_updates)
 
 
 # =============================
@@ -757,6 +894,7 @@ play_multi_button = tk.Button(root, text="10 🎲", font=("Helvetica", 14), comm
 
 pause_button = tk.Button(root, text="⏸ Pause Tracking", command=toggle_pause, font=("Helvetica", 12), cursor="hand2")
 stop_button  = tk.Button(root, text="🛑 Stop Tracking",  command=stop_tracking,  font=("Helvetica", 12), cursor="hand2")
+add_button   = tk.Button(root, text="➕ Track Another App", command=add_tracking, font=("Helvetica", 12), cursor="hand2")
 
 resume_frame = tk.Frame(root)
 resume_frame.pack(pady=5)
@@ -787,35 +925,91 @@ def _sync_settings_ui():
 
 def _apply_rolls(n: int):
     """Apply & persist new ROLLS_PER_MULTI and refresh UI immediately.
-    Restart tracker so downstream logic picks the new setting.
+    A running tracker picks it up between ticks.
     """
     global ROLLS_PER_MULTI
     ROLLS_PER_MULTI = int(n)
     _settings_save_rolls(ROLLS_PER_MULTI)
     _sync_settings_ui()
-    if current_tracking:
-        try:
-            if tracking_thread and tracking_thread.is_alive():
-                tracking_stop_event.set()
-                tracking_thread.join(timeout=2)
-        except Exception:
-            pass
-        _start_tracker(current_tracking)
+    if tracking_control:
+        tracking_control.set_rolls_per_multi(ROLLS_PER_MULTI)
+
+def _apply_background():
+    global BACKGROUND_TRACKING
+    BACKGROUND_TRACKING = bool(background_var.get())
+    _settings_save_background(BACKGROUND_TRACKING)
+
+def _apply_animate():
+    """Toggle instant vs animated multi-roll results and persist it."""
+    global MULTI_ANIMATE
+    MULTI_ANIMATE = bool(animate_var.get())
+    _settings_save_animate(MULTI_ANIMATE)
 
 # Populate menu (examples 6/8/10)
 # Populate menu (examples 6/8/10)
 settings_menu.add_radiobutton(label="Relax (6)",  variable=rolls_var, value=6,  command=lambda: _apply_rolls(6))
 settings_menu.add_radiobutton(label="Normal (8)", variable=rolls_var, value=8,  command=lambda: _apply_rolls(8))
 settings_menu.add_radiobutton(label="十连 (10)",   variable=rolls_var, value=10, command=lambda: _apply_rolls(10))
+settings_menu.add_separator()
+settings_menu.add_checkbutton(label="Animated multi-roll", variable=animate_var, command=_apply_animate)
+settings_menu.add_checkbutton(label="Keep tracking after close", variable=background_var, command=_apply_background)
+BACKGROUND_MENU_INDEX = settings_menu.index("end")
+
+def _sync_background_menu():
+    """Disable "Keep tracking after close" where no daemon can be started."""
+    global BACKGROUND_TRACKING
+    try:
+        from dopamine_core import daemon
+        if daemon.can_spawn():
+            return
+        settings_menu.entryconfig(BACKGROUND_MENU_INDEX, state="disabled")
+        BACKGROUND_TRACKING = False
+        background_var.set(False)
+    except Exception:
+        pass
 
 
 # =============================
 # Init (load settings before first label update)
 # =============================
-ROLLS_PER_MULTI = _settings_load_rolls()  # load from txt
+_mark("build widgets")
+ROLLS_PER_MULTI = _settings_load_rolls()  # load from the settings table
+MULTI_ANIMATE = _settings_load_animate()
+set_prize_table(load_prize_table(store))  # PRIZE_TABLE setting, else 49/2/49
+BACKGROUND_TRACKING = _settings_load_background()
+animate_var.set(MULTI_ANIMATE)
+background_var.set(BACKGROUND_TRACKING)
 _sync_settings_ui()
+_mark("load settings")
 resume_last_tracking()
-auto_refresh_chance()
+_mark("resume last tracking (icon extract)")
+chances.subscribe(_on_chances_changed)
+_pump_ui_updates()
 
 root.protocol("WM_DELETE_WINDOW", on_close)
+
+
+def _after_first_frame():
+    # asset copies are off the startup path
+    def _warm_assets():
+        ensure_assets()
+        audio.preload()   # resolve the wav paths before the first award
+    get_scheduler().once(0, _warm_assets, name="warm_assets")
+    notifier.prebuild()   # toast windows exist before the first roll
+    _sync_background_menu()   # imports the daemon module: kept off the startup path
+    _show_daemon_status()
+    if _prof:
+        _mark("first frame")
+        _prof.uninstall()
+        text = _prof.report()
+        print(text)
+        try:
+            with open(os.path.join(APP_DIR, "startup_profile.txt"), "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        except Exception:
+            pass
+        root.after(0, on_close)
+
+
+root.after_idle(lambda: root.after(0, _after_first_frame))
 root.mainloop()
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('icon2.ico', '.'), ('cheer.wav', '.'), ('good.wav', '.')],
-    hiddenimports=[],
+    hiddenimports=['dopamine_core.daemon'],   # run by `DopamineLottery.exe --daemon`
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
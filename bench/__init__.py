@@ -0,0 +1 @@
+"""Headless benchmarks for the tracker, persistence and lottery paths (python -m bench.run)."""
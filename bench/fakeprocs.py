@@ -0,0 +1,24 @@
+import random
+
+# Synthetic process table implementing the process-backend interface
+# (iter_processes / create_time), so scans can be timed at any size.
+
+
+class FakeProcesses:
+    name = "fake"
+
+    def __init__(self, n: int, targets=("chrome.exe",), seed: int = 0):
+        rng = random.Random(seed)
+        names = [f"proc{i % 997}.exe" for i in range(n)]
+        for k, t in enumerate(targets):   # sprinkle the targets in
+            names[rng.randrange(n)] = t
+        pids = rng.sample(range(100, 100 + 8 * n), n)
+        self.table = {pid: (name, 1_700_000_000.0 + pid) for pid, name in zip(pids, names)}
+
+    def iter_processes(self):
+        for pid, (name, ctime) in self.table.items():
+            yield pid, name, ctime
+
+    def create_time(self, pid: int):
+        entry = self.table.get(pid)
+        return entry[1] if entry else None
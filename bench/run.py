@@ -0,0 +1,319 @@
+"""Benchmark runner (no GUI, no Windows needed).
+
+    python -m bench.run                       # everything, writes bench/results/<rev>.json
+    python -m bench.run -k scan -k lottery    # only benchmarks whose name contains these
+    python -m bench.run --quick               # smaller sizes, fewer repeats
+    python -m bench.run --compare bench/results/old.json
+    python -m bench.run -k live --spawn 2000  # procfs vs psutil on the real process table
+
+Each benchmark is timed like timeit: the call count is grown until one
+repeat takes at least MIN_REPEAT_SECONDS, then the best of `repeat` runs
+is reported as seconds per call. Everything runs against a throwaway
+APP_DIR, so the real chance balance is never touched.
+"""
+import argparse, json, os, platform, subprocess, sys, tempfile, time
+
+# must happen before dopamine_core picks its APP_DIR
+_TMP = tempfile.mkdtemp(prefix="dopamine-bench-")
+os.environ["LOCALAPPDATA"] = _TMP
+os.environ.setdefault("DOPAMINE_SOUND", "null")
+
+from dopamine_core.backends import ProcfsProcesses, PsutilProcesses
+from dopamine_core.journal import Journal
+from dopamine_core.lottery import draw_one, roll_batch
+from dopamine_core.store import ChanceCounter, ProgressStore, Store
+from dopamine_core.tracker import _build_index, _full_scan, _scan_tick
+
+from bench.fakeprocs import FakeProcesses
+
+MIN_REPEAT_SECONDS = 0.2
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+BENCHMARKS = []   # (name, params, factory); factory(**params) -> (fn, items per call)
+
+def benchmark(name: str, **grid):
+    """Register `factory` once per combination of the (single) parameter grid."""
+    def deco(factory):
+        if not grid:
+            BENCHMARKS.append((name, {}, factory))
+        for key, values in grid.items():
+            for v in values:
+                BENCHMARKS.append((name, {key: v}, factory))
+        return factory
+    return deco
+
+
+def _store(tag: str) -> Store:
+    return Store(os.path.join(_TMP, f"{tag}-{time.perf_counter_ns()}.db"))
+
+
+# ---------------- process scanning ----------------
+PROC_SIZES = (100, 1_000, 10_000, 50_000)
+
+def make_procs(n: int):
+    """Process backend under test (a synthetic table of n processes)."""
+    return FakeProcesses(n)
+
+@benchmark("scan.full", n=PROC_SIZES)
+def _scan_full(n):
+    procs, index = make_procs(n), _build_index(["chrome.exe", "code.exe"])
+    return (lambda: _full_scan(index, procs)), n
+
+@benchmark("scan.pinned_tick", n=PROC_SIZES)
+def _scan_pinned(n):
+    procs, index = make_procs(n), _build_index(["chrome.exe"])
+    pins, last_full = _scan_tick(index, {}, 0.0, procs)
+    if not pins:
+        raise RuntimeError("target not found in the synthetic table")
+    return (lambda: _scan_tick(index, pins, last_full, procs)), 1
+
+@benchmark("scan.partial_tick", n=PROC_SIZES)
+def _scan_partial(n):
+    # one target running, one not: the running one stays on its pin
+    procs, index = make_procs(n), _build_index(["chrome.exe", "notrunning.exe"])
+    pins, last_full = _scan_tick(index, {}, 0.0, procs)
+    return (lambda: _scan_tick(index, pins, last_full, procs)), 1
+
+@benchmark("scan.absent_tick", n=PROC_SIZES)
+def _scan_absent(n):
+    # the target isn't running: every tick is a full scan
+    procs, index = make_procs(n), _build_index(["notrunning.exe"])
+    return (lambda: _scan_tick(index, {}, 0.0, procs)), n
+
+
+# ---------------- real process table: procfs vs psutil ----------------
+LIVE_BACKENDS = {
+    "procfs": ProcfsProcesses,
+    "procfs-trusting": lambda: ProcfsProcesses(revalidate=False),   # PID diff only
+    "psutil": PsutilProcesses,
+}
+
+def _live_target(procs) -> str:
+    return next(name for _, name, _ in procs.iter_processes())
+
+@benchmark("live.cold_scan", backend=tuple(LIVE_BACKENDS))
+def _live_cold(backend):
+    # a fresh backend each call: every process is read
+    cls = LIVE_BACKENDS[backend]
+    index = _build_index(["notrunning.exe"])
+    n = sum(1 for _ in cls().iter_processes())
+    return (lambda: _full_scan(index, cls())), n
+
+@benchmark("live.scan", backend=tuple(LIVE_BACKENDS))
+def _live_scan(backend):
+    # steady state: the same backend scans again (procfs only reads new PIDs)
+    procs = LIVE_BACKENDS[backend]()
+    index = _build_index(["notrunning.exe"])
+    _, n = _full_scan(index, procs)
+    return (lambda: _full_scan(index, procs)), n
+
+@benchmark("live.pinned_tick", backend=tuple(LIVE_BACKENDS))
+def _live_pinned(backend):
+    procs = LIVE_BACKENDS[backend]()
+    index = _build_index([_live_target(procs)])
+    pins, last_full = _scan_tick(index, {}, 0.0, procs)
+    return (lambda: _scan_tick(index, pins, last_full, procs)), 1
+
+
+# ---------------- carry-over persistence ----------------
+PROGRESS_SIZES = (1, 100, 1_000, 10_000)
+
+@benchmark("progress.save_all", n=PROGRESS_SIZES)
+def _progress_save(n):
+    # every entry changed since the last flush (worst case)
+    progress = ProgressStore(_store("progress"))
+    names = [f"app{i}.exe" for i in range(n)]
+    tick = [0]
+    def run():
+        tick[0] += 1
+        progress.update({k: tick[0] for k in names})
+        progress.flush()
+    return run, n
+
+@benchmark("progress.save_one_dirty", n=PROGRESS_SIZES)
+def _progress_save_one(n):
+    # the steady state: one tracked exe moved among n stored ones
+    progress = ProgressStore(_store("progress"))
+    progress.update({f"app{i}.exe": i for i in range(n)})
+    progress.flush()
+    tick = [0]
+    def run():
+        tick[0] += 1
+        progress.set("app0.exe", tick[0])
+        progress.flush()
+    return run, 1
+
+@benchmark("progress.load", n=PROGRESS_SIZES)
+def _progress_load(n):
+    store = _store("progress")
+    store.set_progress_many({f"app{i}.exe": i for i in range(n)})
+    def run():
+        ProgressStore(store).get("app0.exe")   # cold: reads the whole table
+    return run, n
+
+
+# ---------------- chances ----------------
+@benchmark("chances.add")
+def _chances_add():
+    counter = ChanceCounter(_store("chances"))
+    return (lambda: counter.add(1)), 1
+
+@benchmark("chances.use")
+def _chances_use():
+    counter = ChanceCounter(_store("chances"))
+    counter.set(10**9)
+    return (lambda: counter.use(1)), 1
+
+
+# ---------------- lottery ----------------
+@benchmark("lottery.draw_only")
+def _draw_only():
+    return draw_one, 1
+
+@benchmark("lottery.single_roll")
+def _single_roll():
+    # draw + pay + record, one transaction per roll (the "Play" button)
+    counter = ChanceCounter(_store("lottery"))
+    counter.set(10**9)
+    def run():
+        r = draw_one()
+        counter.use_for_roll(r.tier or r.outcome, r.prize)
+    return run, 1
+
+@benchmark("lottery.multi_roll", n=(10, 100))
+def _multi_roll(n):
+    counter = ChanceCounter(_store("lottery"))
+    counter.set(10**9)
+    return (lambda: roll_batch(n, counter)), n
+
+
+# ---------------- session journal ----------------
+def _journal(tag: str) -> Journal:
+    return Journal(os.path.join(_TMP, f"{tag}-{time.perf_counter_ns()}"), store=_store(tag))
+
+@benchmark("journal.append")
+def _journal_append():
+    # buffered: most calls never touch the disk
+    journal = _journal("journal")
+    return (lambda: journal.append("end", exe="app.exe", since=0.0, s=1.0)), 1
+
+@benchmark("journal.recover", n=(1_000, 100_000, 1_000_000))
+def _journal_recover(n):
+    # rebuild the summary after n records of history (snapshot + unfolded segments)
+    journal = _journal("journal")
+    for i in range(n):
+        journal.append("end", exe=f"app{i % 20}.exe", since=0.0, s=1.0)
+    journal.close()
+    return journal.summary, n
+
+
+# ---------------- harness ----------------
+def _time(fn, repeat: int) -> tuple[float, float, int]:
+    """(best, mean) seconds per call and the calls per repeat."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= MIN_REPEAT_SECONDS or number >= 1 << 20:
+            break
+        number *= 2 if elapsed * 10 > MIN_REPEAT_SECONDS else 10
+    runs = [elapsed]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append(time.perf_counter() - t0)
+    return min(runs) / number, sum(runs) / len(runs) / number, number
+
+def _git_rev() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=os.path.dirname(RESULTS_DIR), timeout=10)
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+def run(selected=None, repeat: int = 5, quick: bool = False) -> dict:
+    results = []
+    for name, params, factory in BENCHMARKS:
+        if selected and not any(s in name for s in selected):
+            continue
+        if quick and any(isinstance(v, int) and v > 1_000 for v in params.values()):
+            continue
+        label = name + "".join(f"[{k}={v}]" for k, v in params.items())
+        try:
+            fn, items = factory(**params)
+        except Exception as e:   # e.g. psutil not installed, no /proc
+            print(f"{label:38s} skipped: {e!r}", flush=True)
+            continue
+        best, mean, number = _time(fn, 2 if quick else repeat)
+        results.append({
+            "name": name, "params": params, "items": items, "number": number,
+            "best_s": best, "mean_s": mean, "items_per_s": items / best if best else None,
+        })
+        print(f"{label:38s} {best * 1e6:12.2f} us/call  {items / best:14,.0f} items/s", flush=True)
+    return {
+        "meta": {
+            "rev": _git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "procs": make_procs(1).name, "live_procs": _live_count(),
+        },
+        "results": results,
+    }
+
+def _live_count() -> int:
+    try:
+        return sum(1 for p in os.listdir("/proc") if p.isdigit())
+    except OSError:
+        return 0
+
+def _spawn_idle(n: int) -> list:
+    """n sleeping children, so the live benchmarks see a realistic table."""
+    cmd = ["sleep", "3600"] if sys.platform != "win32" else [sys.executable, "-c", "import time; time.sleep(3600)"]
+    return [subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL) for _ in range(n)]
+
+def compare(old: dict, new: dict) -> None:
+    """Print best-time ratios new/old (>1 means slower)."""
+    key = lambda r: (r["name"], json.dumps(r["params"], sort_keys=True))
+    before = {key(r): r for r in old["results"]}
+    print(f"\nvs {old['meta'].get('rev')}  (new/old best time)")
+    for r in new["results"]:
+        o = before.get(key(r))
+        if o and o["best_s"]:
+            ratio = r["best_s"] / o["best_s"]
+            flag = "  SLOWER" if ratio > 1.10 else "  faster" if ratio < 0.90 else ""
+            label = r["name"] + "".join(f"[{k}={v}]" for k, v in r["params"].items())
+            print(f"{label:38s} {ratio:6.2f}x{flag}")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Dopamine Lottery benchmarks.")
+    ap.add_argument("-k", action="append", dest="select", help="run benchmarks whose name contains this")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--quick", action="store_true", help="sizes <= 1000, 2 repeats")
+    ap.add_argument("--out", help="results JSON (default bench/results/<rev>.json)")
+    ap.add_argument("--compare", help="earlier results JSON to compare against")
+    ap.add_argument("--spawn", type=int, default=0, help="idle child processes for the live.* benchmarks")
+    a = ap.parse_args(argv)
+
+    children = _spawn_idle(a.spawn)
+    try:
+        report = run(a.select, a.repeat, a.quick)
+    finally:
+        for c in children:
+            c.kill()
+            c.wait()
+    out = a.out or os.path.join(RESULTS_DIR, f"{report['meta']['rev']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nwrote {out}")
+    if a.compare:
+        with open(a.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
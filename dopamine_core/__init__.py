@@ -0,0 +1,16 @@
+"""Headless core of Dopamine Lottery: tracking, state and lottery engine.
+
+Nothing in this package imports Tk, PIL or win32 at module level; platform
+specifics live behind the backends in `dopamine_core.backends`.
+"""
+from .paths import APP_NAME, APP_DIR, find_asset, ensure_asset, asset_table, invalidate_assets
+from .store import Store, ChanceCounter, ProgressStore, default_store
+from .state import get_store, get_chances, get_progress
+from .lottery import PrizeTable, Tier, Roll, draw_one, draw_many, roll_batch, summarize
+from .tracker import TIME_REQUIRED, TrackerControl, Tracker, run_tracker, schedule_tracker
+from .tracker import award_chances, fmt_hhmmss, get_scan_stats
+from .backends import get_sound_backend, get_icon_backend, get_process_backend, set_backend
+from .audio import get_audio
+from .uiqueue import UpdateQueue
+from .scheduler import Scheduler, get_scheduler
+from .journal import Journal, get_journal
@@ -0,0 +1,129 @@
+import heapq, itertools, threading
+
+from .backends import get_sound_backend
+from .paths import find_asset
+
+# One long-lived audio worker instead of a thread per sound. Requests go into a
+# small bounded priority queue: a sound already waiting is not queued twice
+# (coalesced), and when the queue is full the least important request is
+# dropped. Sound files are resolved once and played asynchronously from their
+# path, so a long clip (the ~12 s cheer) never holds the worker: the next sound
+# starts right away and cuts the current one.
+
+HIGH, NORMAL, LOW = 0, 1, 2   # jackpot / cheer, chance awards, clicks & beeps
+QUEUE_SIZE = 8
+
+# name -> asset file; resolved on first use
+SOUNDS = {"good": "good.wav", "cheer": "cheer.wav"}
+
+
+class AudioService:
+    def __init__(self, backend=None, maxsize: int = QUEUE_SIZE):
+        self.backend = backend or get_sound_backend()
+        self.maxsize = maxsize
+        self.stats = {"played": 0, "coalesced": 0, "dropped": 0, "errors": 0}
+        self._bank = {}            # name -> resolved path (None: missing)
+        self._heap = []            # (priority, seq, key, action)
+        self._keys = set()         # keys currently queued, for coalescing
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    # ---------------- sound bank ----------------
+    def _load(self, name: str):
+        if name not in self._bank:
+            self._bank[name] = find_asset(SOUNDS.get(name, name))
+        return self._bank[name]
+
+    def preload(self, names=None) -> None:
+        """Resolve sound files now (call off the UI thread)."""
+        for name in (names or SOUNDS):
+            self._load(name)
+
+    # ---------------- requests ----------------
+    def play(self, name: str, priority: int = NORMAL, fallback_beep=(900, 120)) -> bool:
+        """Queue a sound from the bank; beeps `fallback_beep` if the file is missing."""
+        def action():
+            path = self._load(name)
+            if path:
+                self.backend.play_file(path)   # async: returns at once
+            elif fallback_beep:
+                self.backend.beep(*fallback_beep)
+        return self._submit(("sound", name), priority, action)
+
+    def beep(self, freq: int, ms: int, priority: int = LOW) -> bool:
+        return self._submit(("beep", freq, ms), priority, lambda: self.backend.beep(freq, ms))
+
+    def stop(self) -> None:
+        """Drop everything queued and cut the current sound."""
+        with self._cv:
+            self._heap.clear()
+            self._keys.clear()
+        try:
+            self.backend.stop()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        self.stop()
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+
+    def queue_depth(self) -> int:
+        return len(self._heap)
+
+    def _submit(self, key, priority: int, action) -> bool:
+        with self._cv:
+            if self._closed:
+                return False
+            if key in self._keys:
+                self.stats["coalesced"] += 1
+                return False
+            if len(self._heap) >= self.maxsize:
+                worst = max(self._heap)
+                if worst[0] <= priority:
+                    self.stats["dropped"] += 1   # nothing less important to evict
+                    return False
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                self._keys.discard(worst[2])
+                self.stats["dropped"] += 1
+            heapq.heappush(self._heap, (priority, next(self._seq), key, action))
+            self._keys.add(key)
+            self._ensure_worker()
+            self._cv.notify()
+            return True
+
+    # ---------------- worker ----------------
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._heap and not self._closed:
+                    self._cv.wait()
+                if self._closed:
+                    return
+                _, _, key, action = heapq.heappop(self._heap)
+                self._keys.discard(key)
+            try:
+                action()           # blocks this worker only
+                self.stats["played"] += 1
+            except Exception:
+                self.stats["errors"] += 1
+
+
+_audio = None
+_audio_lock = threading.Lock()
+
+def get_audio() -> AudioService:
+    global _audio
+    with _audio_lock:
+        if _audio is None:
+            _audio = AudioService()
+        return _audio
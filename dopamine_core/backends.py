@@ -0,0 +1,318 @@
+import os, sys
+
+# Platform backends. Everything Windows-specific (winsound, win32gui/win32ui,
+# PIL for icon bitmaps) is imported lazily inside the Windows backends, so the
+# engine imports cleanly on a Linux box. DOPAMINE_SOUND=null / DOPAMINE_ICONS=null
+# force the stubs (CI, headless runs); DOPAMINE_PROCS=procfs|psutil picks the
+# process-discovery backend.
+
+
+# ---------------- sound ----------------
+class NullSound:
+    """Silent backend for headless / non-Windows runs."""
+    name = "null"
+
+    def beep(self, freq: int, ms: int) -> None:
+        pass
+
+    def play_file(self, path: str, *, wait: bool = False) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class WinSound:
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+        self._ws = winsound
+
+    def beep(self, freq: int, ms: int) -> None:
+        self._ws.Beep(freq, ms)
+
+    def play_file(self, path: str, *, wait: bool = False) -> None:
+        flags = self._ws.SND_FILENAME | self._ws.SND_NODEFAULT
+        if not wait:
+            flags |= self._ws.SND_ASYNC
+        self._ws.PlaySound(path, flags)
+
+    def stop(self) -> None:
+        self._ws.PlaySound(None, self._ws.SND_PURGE)
+
+
+# ---------------- icons ----------------
+class NullIcons:
+    name = "null"
+
+    def extract(self, exe_path: str):
+        return None
+
+
+class Win32Icons:
+    """First icon of an exe as a 32x32 RGBA PIL image (ExtractIconEx + GDI).
+
+    Every HICON, DC and bitmap created here is released before returning,
+    so GDI/USER handle counts stay flat over long sessions.
+    """
+    name = "win32"
+
+    def extract(self, exe_path: str):
+        import win32con, win32gui, win32ui
+        from PIL import Image
+
+        large, small = win32gui.ExtractIconEx(exe_path, 0)
+        try:
+            if not large:
+                return None
+            screen = win32gui.GetDC(0)
+            hdc = win32ui.CreateDCFromHandle(screen)
+            mem = hdc.CreateCompatibleDC()
+            hbmp = win32ui.CreateBitmap()
+            try:
+                hbmp.CreateCompatibleBitmap(hdc, 32, 32)
+                mem.SelectObject(hbmp)
+                win32gui.DrawIconEx(mem.GetHandleOutput(), 0, 0, large[0], 32, 32, 0, None, win32con.DI_NORMAL)
+                bmpinfo = hbmp.GetInfo()
+                bmpstr = hbmp.GetBitmapBits(True)
+            finally:
+                mem.DeleteDC()
+                win32gui.DeleteObject(hbmp.GetHandle())
+                win32gui.ReleaseDC(0, screen)
+            return Image.frombuffer(
+                'RGBA',
+                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
+                bmpstr, 'raw', 'BGRA', 0, 1
+            )
+        finally:
+            for h in list(large) + list(small):
+                try:
+                    win32gui.DestroyIcon(h)
+                except Exception:
+                    pass
+
+
+# ---------------- process discovery ----------------
+class PsutilProcesses:
+    """Portable process discovery via psutil."""
+    name = "psutil"
+
+    def __init__(self):
+        import psutil
+        self._psutil = psutil
+
+    def iter_processes(self):
+        """Yield (pid, name, create_time) for every visible process."""
+        for p in self._psutil.process_iter(['name', 'create_time']):
+            yield p.pid, p.info.get('name') or '', p.info.get('create_time')
+
+    def create_time(self, pid: int):
+        """create_time of a live pid, or None if it is gone / not accessible."""
+        try:
+            return self._psutil.Process(pid).create_time()
+        except Exception:
+            return None
+
+    def details(self, pid: int):
+        """{"exe", "cmdline", "parent"} for rule matching; fields may be ""."""
+        try:
+            p = self._psutil.Process(pid)
+        except Exception:
+            return None
+        out = {"exe": "", "cmdline": "", "parent": ""}
+        with p.oneshot():
+            for key, get in (("exe", p.exe), ("cmdline", lambda: " ".join(p.cmdline())),
+                             ("parent", lambda: p.parent().name())):
+                try:
+                    out[key] = get() or ""
+                except Exception:
+                    pass   # access denied / zombie: that clause just won't match
+        return out
+
+
+class ProcfsProcesses:
+    """Linux: read /proc directly, only what the tracker needs.
+
+    One scandir of /proc per scan. New PIDs get their /proc/<pid>/stat read
+    and resolved into (name, start time); names truncated by the kernel
+    (15 chars) are completed from the /proc/<pid>/exe link, like psutil does.
+
+    Known PIDs are revalidated by default. Their stat is re-read into the
+    same buffer, and only its comm and start time (field 22) are compared
+    with the cached entry. The readlink is redone only if either changed.
+
+    That costs one small read per process per full scan. Full scans are rare
+    once targets are pinned. The read catches a process that exec()s into
+    the target, such as a shell or launcher. It also catches a PID reused
+    by a process with the same comm. Without it, either would keep a stale
+    name or create time.
+
+    revalidate=False is the bare PID diff. It is cheaper, and the
+    live.scan[backend=procfs-trusting] bench case measures the difference.
+    """
+    name = "procfs"
+    COMM_MAX = 15
+
+    def __init__(self, root: str = "/proc", revalidate: bool = True):
+        self.root = root
+        self.revalidate = revalidate
+        self._buf = bytearray(4096)
+        self._known = {}            # pid -> (name, create_time, comm), from the last scan
+        self.stats = {"scans": 0, "reads": 0, "checks": 0}
+        self._tck = os.sysconf("SC_CLK_TCK")
+        self._btime = None
+        with open(os.path.join(root, "stat"), "rb") as f:
+            for line in f:
+                if line.startswith(b"btime "):
+                    self._btime = float(line.split()[1])
+                    break
+        if self._btime is None:
+            raise OSError("no btime in /proc/stat")
+
+    def _read(self, path: str):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            n = os.readv(fd, [self._buf])
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        return bytes(memoryview(self._buf)[:n])
+
+    def _parse_stat(self, pid: int):
+        """(comm bytes, create_time, ppid) from /proc/<pid>/stat, or None if it is gone."""
+        data = self._read(f"{self.root}/{pid}/stat")
+        if data is None:
+            return None
+        lp, rp = data.find(b"("), data.rfind(b")")   # comm may contain ')' or spaces
+        if lp < 0 or rp < 0:
+            return None
+        try:
+            fields = data[rp + 2:].split(None, 20)
+            ppid, start = int(fields[1]), int(fields[19])   # fields 4 and 22
+        except (IndexError, ValueError):
+            return None
+        return data[lp + 1:rp], round(self._btime + start / self._tck, 2), ppid
+
+    def _read_stat(self, pid: int, parsed=None):
+        """(name, create_time, ppid, comm) of pid, or None if it is gone."""
+        parsed = parsed or self._parse_stat(pid)
+        if parsed is None:
+            return None
+        self.stats["reads"] += 1
+        raw, ctime, ppid = parsed
+        name = comm = raw.decode("utf-8", "replace")
+        if len(name) >= self.COMM_MAX:
+            try:
+                exe = os.path.basename(os.readlink(f"{self.root}/{pid}/exe"))
+                if exe.startswith(name):
+                    name = exe
+            except OSError:
+                pass
+        return name, ctime, ppid, comm
+
+    def iter_processes(self):
+        """Yield (pid, name, create_time); unchanged PIDs come from the last scan."""
+        known, current = self._known, {}
+        revalidate = self.revalidate
+        self.stats["scans"] += 1
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.name.isdigit():
+                    continue
+                pid = int(entry.name)
+                info = known.get(pid)
+                parsed = None
+                if info is not None and revalidate:
+                    self.stats["checks"] += 1
+                    parsed = self._parse_stat(pid)
+                    if parsed is None:
+                        continue   # exited while we looked
+                    if parsed[1] != info[1] or parsed[0].decode("utf-8", "replace") != info[2]:
+                        info = None   # exec()ed into something else, or a reused PID
+                if info is None:
+                    st = self._read_stat(pid, parsed)
+                    if st is None:
+                        continue
+                    info = (st[0], st[1], st[3])
+                current[pid] = info
+        self._known = current
+        for pid, (name, ctime, _) in current.items():
+            yield pid, name, ctime
+
+    def create_time(self, pid: int):
+        st = self._read_stat(pid)
+        info = (st[0], st[1], st[3]) if st else None
+        # keep the scan cache honest: a reused or exited PID must not come
+        # back from the next iter_processes() under its old identity
+        if info is None:
+            self._known.pop(pid, None)
+        elif self._known.get(pid, info) != info:
+            self._known[pid] = info
+        return info[1] if info else None
+
+    def details(self, pid: int):
+        """{"exe", "cmdline", "parent"} for rule matching; fields may be ""."""
+        st = self._read_stat(pid)
+        if st is None:
+            return None
+        out = {"exe": "", "cmdline": "", "parent": ""}
+        try:
+            out["exe"] = os.readlink(f"{self.root}/{pid}/exe")
+        except OSError:
+            pass
+        try:
+            with open(f"{self.root}/{pid}/cmdline", "rb") as f:
+                out["cmdline"] = f.read().rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace")
+        except OSError:
+            pass
+        parent = self._known.get(st[2]) or self._read_stat(st[2])
+        if parent:
+            out["parent"] = parent[0]
+        return out
+
+
+# ---------------- selection ----------------
+_cache = {}
+
+def _pick(kind: str, env: str, factories):
+    if kind in _cache:
+        return _cache[kind]
+    want = os.environ.get(env, "").lower()
+    backend = None
+    for name, factory in factories:
+        if want and name != want:
+            continue
+        try:
+            backend = factory()
+            break
+        except Exception:
+            continue
+    _cache[kind] = backend
+    return backend
+
+def get_sound_backend():
+    factories = [("null", NullSound)]
+    if sys.platform == "win32":
+        factories.insert(0, ("winsound", WinSound))
+    return _pick("sound", "DOPAMINE_SOUND", factories) or NullSound()
+
+def get_icon_backend():
+    factories = [("null", NullIcons)]
+    if sys.platform == "win32":
+        factories.insert(0, ("win32", Win32Icons))
+    return _pick("icons", "DOPAMINE_ICONS", factories) or NullIcons()
+
+def get_process_backend():
+    factories = [("psutil", PsutilProcesses)]   # portable fallback
+    if sys.platform.startswith("linux"):
+        factories.insert(0, ("procfs", ProcfsProcesses))
+    return _pick("procs", "DOPAMINE_PROCS", factories)
+
+def set_backend(kind: str, backend) -> None:
+    """Override a backend ("sound" | "icons" | "procs"), e.g. in benchmarks."""
+    _cache[kind] = backend
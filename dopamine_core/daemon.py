@@ -0,0 +1,418 @@
+"""Headless tracker daemon with a local IPC endpoint (no Tk / PIL / win32 UI).
+
+    python -m dopamine_core.daemon serve                 # run in the foreground
+    python -m dopamine_core.daemon start chrome.exe code.exe
+    python -m dopamine_core.daemon configure --rolls-per-multi 8   # live, no restart
+    python -m dopamine_core.daemon status | pause | resume | stop | balance
+    python -m dopamine_core.daemon roll 10
+    python -m dopamine_core.daemon metrics               # with DOPAMINE_METRICS=1
+    python -m dopamine_core.daemon journal               # time per exe / day, awards
+    python -m dopamine_core.daemon shutdown
+
+The endpoint is a Unix domain socket in APP_DIR on Linux/macOS and a
+per-user named pipe on Windows. Messages are one JSON object per frame
+(multiprocessing.connection framing, no pickle): {"cmd": ..., ...} in,
+{"ok": true, ...} or {"ok": false, "error": ...} out. Any number of clients
+(the GUI, this CLI, scripts) can attach and detach while the daemon keeps
+crediting time.
+"""
+import argparse, getpass, json, os, subprocess, sys, threading, time
+from multiprocessing.connection import Client, Listener
+
+from .journal import get_journal
+from .lottery import load_prize_table, roll_batch, set_prize_table, summarize
+from .metrics import render as render_metrics
+from .paths import APP_DIR, APP_NAME
+from .state import get_chances, get_progress, get_store
+from .scheduler import get_scheduler
+from .tracker import TrackerControl, get_scan_stats, schedule_tracker
+
+REPLY_TIMEOUT = 10.0   # seconds a client waits for an answer
+MAX_ROLLS = 1000       # per "roll" request
+
+
+class DaemonError(Exception):
+    pass
+
+
+# ---------------- endpoint ----------------
+def default_address() -> tuple[str, str]:
+    """(address, family) for this user's endpoint."""
+    if sys.platform == "win32":
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = "default"
+        return rf"\\.\pipe\{APP_NAME}-{user}", "AF_PIPE"
+    return os.path.join(APP_DIR, "daemon.sock"), "AF_UNIX"
+
+
+# ---------------- tracker service ----------------
+class TrackerService:
+    """Owns the tracker job; every method is safe to call from any client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._job = None
+        self._control = None
+        self.targets = []
+        self.rolls_per_multi = 10
+        self.total_seconds = 0
+        self.awards = 0
+        self.last_award = None
+        self.started_at = None
+
+    @property
+    def paused(self) -> bool:
+        return self._control is not None and self._control.paused
+
+    def running(self) -> bool:
+        return self._job is not None and not self._job.done
+
+    def start(self, targets, rolls_per_multi=None, time_required=None) -> None:
+        """Start tracking, or retarget the running tracker in place."""
+        targets = [t for t in (targets or []) if t]
+        if not targets:
+            raise DaemonError("no targets")
+        with self._lock:
+            if self.running():
+                self._control.set_paused(False)
+                self._configure_locked(targets, rolls_per_multi, time_required)
+                return
+            if rolls_per_multi is None:
+                rolls_per_multi = get_store().get_int_setting("ROLLS_PER_MULTI", 10)
+            self.targets = targets
+            self.rolls_per_multi = max(1, int(rolls_per_multi))
+            self.total_seconds, self.started_at = 0, time.time()
+            self._control = TrackerControl()
+            self._job = schedule_tracker(
+                targets,
+                control=self._control,
+                time_required=time_required,
+                rolls_per_multi=self.rolls_per_multi,
+                on_tick=self._on_tick,
+                on_chance=self._on_chance,
+            )
+
+    def configure(self, targets=None, rolls_per_multi=None, time_required=None) -> None:
+        """Live changes, applied by the tracker between ticks."""
+        with self._lock:
+            if not self.running():
+                raise DaemonError("not tracking")
+            self._configure_locked(targets, rolls_per_multi, time_required)
+
+    def _configure_locked(self, targets, rolls_per_multi, time_required):
+        if targets:
+            self.targets = [t for t in targets if t]
+            self._control.set_targets(self.targets)
+        if rolls_per_multi is not None:
+            self.rolls_per_multi = max(1, int(rolls_per_multi))
+            self._control.set_rolls_per_multi(self.rolls_per_multi)
+        if time_required is not None:
+            self._control.set_time_required(time_required)
+
+    def set_paused(self, flag: bool) -> None:
+        if self._control is not None:
+            self._control.set_paused(flag)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_locked()
+
+    def _stop_locked(self):
+        # waits for the tracker's final progress flush, so a client that
+        # takes over tracking next reads up-to-date carry-over seconds
+        if self._control is not None:
+            self._control.stop()
+        if self._job is not None:
+            self._job.wait(timeout=5)
+        self._job = self._control = None
+        self.targets = []
+
+    def _on_tick(self, total_seconds):
+        self.total_seconds = total_seconds
+
+    def _on_chance(self, balance, milestones, count):
+        self.awards += count
+        self.last_award = {"balance": balance, "count": count, "milestones": milestones,
+                           "ts": time.time()}
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "running": self.running(),
+            "paused": self.paused,
+            "targets": list(self.targets),
+            "rolls_per_multi": self.rolls_per_multi,
+            "tracked_seconds": int(self.total_seconds),
+            "started_at": self.started_at,
+            "awards": self.awards,
+            "last_award": self.last_award,
+            "balance": get_chances().value,
+            "scan": get_scan_stats(),
+            "jobs": get_scheduler().stats(),
+        }
+
+
+# ---------------- server ----------------
+class DaemonServer:
+    def __init__(self, address=None, family=None):
+        if address is None:
+            address, family = default_address()
+        self.address, self.family = address, family
+        self.service = TrackerService()
+        self._listener = None
+        self._closing = threading.Event()
+        self._handlers = {
+            "ping": lambda req: {},
+            "status": lambda req: self.service.status(),
+            "start": self._cmd_start,
+            "configure": self._cmd_configure,
+            "stop": lambda req: self.service.stop() or {},
+            "pause": lambda req: self._set_paused(True),
+            "resume": lambda req: self._set_paused(False),
+            "balance": lambda req: {"balance": self._balance()},
+            "roll": self._cmd_roll,
+            "metrics": lambda req: {"text": render_metrics()},   # empty unless DOPAMINE_METRICS=1
+            "journal": self._cmd_journal,
+            "shutdown": self._cmd_shutdown,
+        }
+
+    def _set_paused(self, flag: bool) -> dict:
+        self.service.set_paused(flag)
+        return {"paused": self.service.paused}
+
+    def _balance(self) -> int:
+        chances = get_chances()
+        chances.refresh_if_changed()   # the GUI may have rolled meanwhile
+        return chances.value
+
+    def _cmd_start(self, req) -> dict:
+        if not self.service.running():
+            get_progress().reload()    # another process may have tracked since
+        self.service.start(req.get("targets"), req.get("rolls_per_multi"), req.get("time_required"))
+        return self.service.status()
+
+    def _cmd_configure(self, req) -> dict:
+        self.service.configure(req.get("targets"), req.get("rolls_per_multi"), req.get("time_required"))
+        return self.service.status()
+
+    def _cmd_roll(self, req) -> dict:
+        n = max(1, min(MAX_ROLLS, int(req.get("n", 1))))
+        chances = get_chances()
+        chances.refresh_if_changed()
+        rolls = roll_batch(n, chances)
+        return {"rolls": [r._asdict() for r in rolls], "summary": summarize(rolls),
+                "balance": chances.value}
+
+    def _cmd_journal(self, req) -> dict:
+        journal = get_journal()
+        if journal is None:
+            raise DaemonError("journal disabled (DOPAMINE_JOURNAL=0)")
+        return {"summary": journal.summary()}
+
+    def _cmd_shutdown(self, req) -> dict:
+        self._closing.set()
+        get_scheduler().call_soon(self._wake_accept, key="daemon-wake")
+        return {}
+
+    def _wake_accept(self):
+        # accept() doesn't return when the listener is closed on every
+        # platform; a throwaway connection unblocks it
+        try:
+            Client(self.address, self.family).close()
+        except Exception:
+            pass
+
+    def handle(self, req: dict) -> dict:
+        handler = self._handlers.get(req.get("cmd"))
+        if handler is None:
+            return {"ok": False, "error": f"unknown command: {req.get('cmd')!r}"}
+        try:
+            out = handler(req)
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        out["ok"] = True
+        return out
+
+    def _serve_conn(self, conn):
+        try:
+            while not self._closing.is_set():
+                try:
+                    req = json.loads(conn.recv_bytes())
+                except (EOFError, OSError):
+                    return   # client detached
+                except ValueError:
+                    reply = {"ok": False, "error": "bad request"}
+                else:
+                    reply = self.handle(req if isinstance(req, dict) else {})
+                conn.send_bytes(json.dumps(reply).encode("utf-8"))
+        except Exception:
+            pass
+        finally:
+            conn.close()
+
+    def _claim_address(self):
+        if is_running(self.address, self.family):
+            raise DaemonError(f"already running at {self.address}")
+        if self.family == "AF_UNIX" and os.path.exists(self.address):
+            os.unlink(self.address)   # stale socket from a crashed daemon
+
+    def serve_forever(self) -> None:
+        self._claim_address()
+        self._listener = Listener(self.address, self.family)
+        if self.family == "AF_UNIX":
+            os.chmod(self.address, 0o600)
+        set_prize_table(load_prize_table(get_store()))
+        try:
+            while not self._closing.is_set():
+                try:
+                    conn = self._listener.accept()
+                except OSError:
+                    continue
+                if self._closing.is_set():
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_conn, args=(conn,), daemon=True).start()
+        finally:
+            self.service.stop()
+            get_progress().flush()
+            self._listener.close()
+
+
+# ---------------- client ----------------
+class DaemonClient:
+    def __init__(self, address=None, family=None):
+        if address is None:
+            address, family = default_address()
+        self._conn = Client(address, family)
+
+    def request(self, cmd: str, **args) -> dict:
+        self._conn.send_bytes(json.dumps({"cmd": cmd, **args}).encode("utf-8"))
+        if not self._conn.poll(REPLY_TIMEOUT):
+            raise DaemonError(f"no reply to {cmd!r}")
+        reply = json.loads(self._conn.recv_bytes())
+        if not reply.pop("ok", False):
+            raise DaemonError(reply.get("error", "request failed"))
+        return reply
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect(address=None, family=None):
+    """A DaemonClient, or None if no daemon is listening."""
+    try:
+        return DaemonClient(address, family)
+    except (OSError, EOFError):
+        return None
+
+def is_running(address=None, family=None) -> bool:
+    client = connect(address, family)
+    if client is None:
+        return False
+    client.close()
+    return True
+
+# The frozen GUI exe runs the daemon when started with this switch
+# (see the top of DopamineLottery.py); a source checkout uses `python -m`.
+FROZEN_DAEMON_FLAG = "--daemon"
+
+def _package_parent() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def spawn_command():
+    """(argv, cwd, extra env) that starts `serve` in the background, or None."""
+    if getattr(sys, "frozen", False):
+        exe = sys.executable
+        return ([exe, FROZEN_DAEMON_FLAG], os.path.dirname(exe), {}) if os.path.isfile(exe) else None
+    parent = _package_parent()
+    if not os.path.isdir(os.path.join(parent, "dopamine_core")):
+        return None
+    path = os.environ.get("PYTHONPATH")
+    return ([sys.executable, "-m", "dopamine_core.daemon", "serve"], parent,
+            {"PYTHONPATH": parent + (os.pathsep + path if path else "")})
+
+def can_spawn() -> bool:
+    return spawn_command() is not None
+
+def spawn(wait: float = 5.0):
+    """Start a background daemon (unless one is up); returns a client or None."""
+    client = connect()
+    if client is not None:
+        return client
+    cmd = spawn_command()
+    if cmd is None:
+        return None
+    argv, cwd, extra = cmd
+    env = dict(os.environ, DOPAMINE_SOUND="null", DOPAMINE_ICONS="null", **extra)
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    proc = subprocess.Popen(argv, cwd=cwd, env=env,
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, close_fds=True, **kwargs)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        client = connect()
+        if client is not None:
+            return client
+        if proc.poll() is not None:
+            return None   # it exited (e.g. failed to start): don't wait out the deadline
+        time.sleep(0.1)
+    return None
+
+
+# ---------------- CLI ----------------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Dopamine Lottery tracker daemon.")
+    ap.add_argument("cmd", choices=["serve", "status", "start", "configure", "stop", "pause",
+                                    "resume", "balance", "roll", "metrics", "journal", "shutdown"])
+    ap.add_argument("args", nargs="*", help="exe names for start, count for roll")
+    ap.add_argument("--rolls-per-multi", type=int, default=None)
+    ap.add_argument("--time-required", type=int, default=None, help="seconds per chance")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "serve":
+        try:
+            DaemonServer().serve_forever()
+        except DaemonError as e:
+            print(e, file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    client = connect()
+    if client is None:
+        print("daemon is not running", file=sys.stderr)
+        return 1
+    req = {}
+    if a.cmd in ("start", "configure"):
+        req = {"targets": a.args, "rolls_per_multi": a.rolls_per_multi,
+               "time_required": a.time_required}
+    elif a.cmd == "roll":
+        req = {"n": int(a.args[0]) if a.args else 1}
+    with client:
+        try:
+            reply = client.request(a.cmd, **req)
+            print(reply["text"] if a.cmd == "metrics" else json.dumps(reply, indent=2))
+        except DaemonError as e:
+            print(e, file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import hashlib, os, threading
+
+from .backends import get_icon_backend
+from .paths import APP_DIR
+
+# On-disk icon cache: one PNG per (exe path, mtime, size) under APP_DIR, so a
+# repeat launch or a stop/resume never goes back to GDI. Tk can load the PNGs
+# directly (tk.PhotoImage(file=...)), so a cache hit needs neither PIL nor
+# win32. Exes without an icon get an empty ".none" marker (negative cache).
+ICON_CACHE_DIR = os.path.join(APP_DIR, "icon_cache")
+
+_lock = threading.Lock()
+STATS = {"hits": 0, "misses": 0, "extracts": 0}
+
+
+def icon_cache_key(exe_path: str) -> str | None:
+    """Stable key for the exe's current version (changes when the exe does)."""
+    try:
+        st = os.stat(exe_path)
+    except OSError:
+        return None
+    raw = f"{os.path.normcase(os.path.abspath(exe_path))}|{st.st_mtime_ns}|{st.st_size}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def icon_png(exe_path: str) -> str | None:
+    """Path to a cached 32x32 PNG of the exe's icon, extracting it on a miss."""
+    key = icon_cache_key(exe_path)
+    if key is None:
+        return None
+    png = os.path.join(ICON_CACHE_DIR, key + ".png")
+    none = os.path.join(ICON_CACHE_DIR, key + ".none")
+    with _lock:
+        if os.path.exists(png):
+            STATS["hits"] += 1
+            return png
+        if os.path.exists(none):
+            STATS["hits"] += 1
+            return None
+        STATS["misses"] += 1
+        try:
+            img = get_icon_backend().extract(exe_path)
+            STATS["extracts"] += 1
+        except Exception:
+            return None
+        try:
+            os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+            if img is None:
+                open(none, "wb").close()
+                return None
+            tmp = png + ".tmp"
+            img.save(tmp, "PNG")
+            os.replace(tmp, png)
+            return png
+        except Exception:
+            return None
@@ -0,0 +1,299 @@
+import atexit, functools, json, os, threading, time
+
+from .paths import APP_DIR
+from .state import get_store
+
+# Append-only session journal: when time was earned and when chances were
+# awarded, one JSON object per line:
+#
+#   {"t": 1760000000.123, "ev": "start", "targets": ["game.exe"]}   tracker started
+#   {"t": ..., "ev": "begin", "exe": "game.exe"}                    target seen running
+#   {"t": ..., "ev": "end", "exe": "game.exe", "since": ..., "s": 1803.2}
+#   {"t": ..., "ev": "award", "n": 3, "balance": 41, "milestones": 0}
+#   {"t": ..., "ev": "stop"}                                        tracker stopped
+#   {"t": ..., "ev": "seal"}                                        segment complete
+#
+# Records are buffered and appended in batches to segment files in
+# APP_DIR/journal (one active segment per writing process; a torn last line
+# after a crash is ignored, and a "begin" left without its "end" is closed
+# at the last record before the next start, or at the end of the replay). Sealed segments are folded into a summary
+# snapshot kept in the database meta table and then deleted, so rebuilding
+# the summary reads the snapshot plus at most a few segments, however long
+# the history. The carry-over seconds and the balance stay in the database;
+# the journal is the record of how they came about.
+
+JOURNAL_DIR = os.path.join(APP_DIR, "journal")
+SNAPSHOT_KEY = "journal_snapshot"
+SEGMENT_BYTES = 256 << 10     # roll to a new segment past this size (~3000 records)
+FLUSH_INTERVAL = 5.0          # buffered records reach the disk at least this often
+BUFFER_RECORDS = 64           # ... or as soon as this many are waiting
+COMPACT_SEGMENTS = 2          # fold once this many sealed segments are waiting
+STALE_SECONDS = 7 * 86400     # unsealed and untouched this long: its writer died
+
+
+def _empty_summary() -> dict:
+    return {"exe": {}, "days": {}, "sessions": 0, "awards": 0, "chances": 0,
+            "records": 0, "first": None, "last": None, "open": {}, "folded": []}
+
+@functools.lru_cache(maxsize=256)
+def _day(hour: int) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(hour * 3600))
+
+def _credit(summary: dict, exe: str, seconds: float, t: float) -> None:
+    e = summary["exe"].setdefault(exe, {"seconds": 0.0, "intervals": 0, "last": None})
+    e["seconds"] += seconds
+    e["intervals"] += 1
+    e["last"] = t
+    day = _day(int(t // 3600))   # credited to the day it ended
+    summary["days"][day] = summary["days"].get(day, 0.0) + seconds
+
+def _close_open(summary: dict, t) -> None:
+    """End intervals whose "end" never came (crash) at time t."""
+    opened = summary.setdefault("open", {})
+    for exe, since in opened.items():
+        _credit(summary, exe, max(0.0, (t or since) - since), t or since)
+    opened.clear()
+
+def _fold(summary: dict, rec: dict) -> None:
+    """Apply one record to the summary state."""
+    ev, t = rec.get("ev"), rec.get("t", 0.0)
+    last = summary["last"]
+    summary["records"] += 1
+    if summary["first"] is None:
+        summary["first"] = t
+    summary["last"] = t
+    opened = summary.setdefault("open", {})
+    exe = rec.get("exe", "?")
+    if ev == "begin":
+        opened[exe] = t
+    elif ev == "end":
+        opened.pop(exe, None)
+        _credit(summary, exe, float(rec.get("s", 0.0)), t)
+    elif ev == "award":
+        summary["awards"] += 1
+        summary["chances"] += int(rec.get("n", 0))
+    elif ev == "start":
+        _close_open(summary, last)   # the previous session crashed mid-interval
+        summary["sessions"] += 1
+    elif ev == "stop":
+        _close_open(summary, t)
+
+def read_segment(path: str):
+    """Records of one segment; stops at a torn or corrupt line."""
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return   # half-written tail (crash mid-append)
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    return
+                if rec.get("ev") != "seal":
+                    yield rec
+    except OSError:
+        return
+
+def _sealed(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, os.path.getsize(path) - 64))
+            return f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1].find(b'"ev":"seal"') != -1
+    except OSError:
+        return False
+
+
+class Journal:
+    """Buffered writer plus compaction / recovery over one journal folder."""
+
+    def __init__(self, folder: str = JOURNAL_DIR, store=None):
+        self.folder = folder
+        self.store = store
+        self._lock = threading.Lock()
+        self._buf = []                # encoded lines not yet on disk
+        self._path = None             # this process's active segment
+        self._size = 0
+        self._job = None
+        self._closed = False
+        self.stats = {"records": 0, "flushes": 0, "segments": 0, "compactions": 0, "errors": 0}
+
+    def _store(self):
+        if self.store is None:
+            self.store = get_store()
+        return self.store
+
+    # ---------------- writing ----------------
+    def append(self, ev: str, **fields) -> None:
+        """Buffer one record; cheap enough to call from the tracker tick."""
+        line = json.dumps({"t": round(time.time(), 3), "ev": ev, **fields},
+                          separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._closed:
+                return
+            self._buf.append(line)
+            self.stats["records"] += 1
+            full = len(self._buf) >= BUFFER_RECORDS
+            if self._job is None:
+                from .scheduler import get_scheduler
+                self._job = get_scheduler().every(FLUSH_INTERVAL, self.flush, name="journal")
+        if full:
+            self.flush()
+
+    def flush(self, sync: bool = False, seal: bool = False) -> bool:
+        """Append buffered records to the active segment. True if anything was written."""
+        rolled = False
+        with self._lock:
+            if not self._buf and not (seal and self._path is not None):
+                return False
+            try:
+                if self._buf and (self._path is None or self._size >= SEGMENT_BYTES
+                                  or not os.path.exists(self._path)):   # compacted away elsewhere
+                    rolled = self._roll_locked()
+                lines = self._buf + ['{"t":%.3f,"ev":"seal"}\n' % time.time()] if seal else self._buf
+                data = "".join(lines).encode("utf-8")
+                with open(self._path, "ab") as f:
+                    f.write(data)
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                self._size += len(data)
+                self._buf.clear()
+                self.stats["flushes"] += 1
+            except OSError:
+                self.stats["errors"] += 1   # kept in the buffer for the next flush
+                return False
+            if seal:
+                self._path = None
+        if rolled:
+            self.compact()
+        return True
+
+    def _roll_locked(self) -> bool:
+        # caller holds _lock; seal the full segment, start a new one
+        os.makedirs(self.folder, exist_ok=True)
+        if self._path is not None and os.path.exists(self._path):
+            with open(self._path, "ab") as f:
+                f.write(b'{"t":%.3f,"ev":"seal"}\n' % time.time())
+        stamp = time.time_ns() // 1000
+        while True:   # names sort by creation time; never reuse one
+            path = os.path.join(self.folder, f"{stamp:016d}-{os.getpid()}.jsonl")
+            if not os.path.exists(path):
+                break
+            stamp += 1
+        self._path, self._size = path, 0
+        self.stats["segments"] += 1
+        return True
+
+    def close(self) -> None:
+        """Flush, fsync and seal; later appends are ignored."""
+        job = self._job
+        if job is not None:
+            job.cancel()
+        self.flush(sync=True, seal=True)
+        with self._lock:
+            self._closed = True
+
+    # ---------------- compaction / recovery ----------------
+    def _segments(self) -> list:
+        try:
+            return sorted(n for n in os.listdir(self.folder) if n.endswith(".jsonl"))
+        except OSError:
+            return []
+
+    def compact(self, min_segments: int = COMPACT_SEGMENTS) -> int:
+        """Fold sealed (or abandoned) segments into the snapshot, then delete them."""
+        active = os.path.basename(self._path) if self._path else None
+        now = time.time()
+        ready = []
+        for name in self._segments():
+            path = os.path.join(self.folder, name)
+            try:
+                stale = now - os.path.getmtime(path) > STALE_SECONDS
+            except OSError:
+                continue
+            if name != active and (stale or _sealed(path)):
+                ready.append(name)
+        if not ready or len(ready) < min_segments:
+            return 0
+
+        def fold(old):
+            summary = json.loads(old) if old else _empty_summary()
+            present = set(self._segments())
+            folded = set(summary["folded"])
+            for name in ready:
+                if name not in folded:   # a crash between commit and delete
+                    for rec in read_segment(os.path.join(self.folder, name)):
+                        _fold(summary, rec)
+            summary["folded"] = sorted((folded | set(ready)) & present)
+            return json.dumps(summary, separators=(",", ":"))
+
+        try:
+            self._store().update_meta(SNAPSHOT_KEY, fold)   # one transaction: processes take turns
+        except Exception:
+            self.stats["errors"] += 1
+            return 0
+        for name in ready:
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except OSError:
+                pass   # still open elsewhere (Windows); skipped as folded next time
+        self.stats["compactions"] += 1
+        return len(ready)
+
+    def _snapshot(self) -> dict:
+        try:
+            raw = self._store().get_meta(SNAPSHOT_KEY)
+        except Exception:
+            raw = None
+        return json.loads(raw) if raw else _empty_summary()
+
+    def records(self):
+        """Records not folded into the snapshot yet, oldest segment first."""
+        self.flush()
+        folded = set(self._snapshot()["folded"])
+        for name in self._segments():
+            if name not in folded:
+                yield from read_segment(os.path.join(self.folder, name))
+
+    def summary(self) -> dict:
+        """Totals per exe and per day, sessions and awards over the whole history.
+
+        Reads the snapshot plus the unfolded segments only. Intervals still
+        open (running now, or cut off by a crash) count up to the last record.
+        """
+        self.flush()
+        summary = self._snapshot()
+        folded = set(summary.pop("folded"))
+        for name in self._segments():
+            if name not in folded:
+                for rec in read_segment(os.path.join(self.folder, name)):
+                    _fold(summary, rec)
+        _close_open(summary, summary["last"])
+        del summary["open"]
+        return summary
+
+
+# ---------------- shared instance ----------------
+_journal = None
+_lock = threading.Lock()
+
+def enabled() -> bool:
+    return os.environ.get("DOPAMINE_JOURNAL", "1") not in ("", "0")
+
+def get_journal():
+    """The process-wide Journal (sealed at exit), or None if DOPAMINE_JOURNAL=0."""
+    global _journal
+    if not enabled():
+        return None
+    with _lock:
+        if _journal is None:
+            _journal = Journal()
+            atexit.register(_close_at_exit, _journal)
+        return _journal
+
+def _close_at_exit(journal: Journal) -> None:
+    # whichever atexit hook comes first, stop the scheduler before sealing:
+    # a stopped tracker's last tick (its "end" / "stop" records) still runs
+    from .scheduler import get_scheduler
+    get_scheduler().shutdown(True, 2.0)
+    journal.close()
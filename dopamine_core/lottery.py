@@ -0,0 +1,201 @@
+import json, os, random
+from typing import NamedTuple
+
+_np = False   # not looked up yet
+
+def numpy_module():
+    """numpy for vectorized bulk draws, imported on first need; None if unavailable.
+
+    DOPAMINE_NUMPY=0 forces the plain-Python path.
+    """
+    global _np
+    if _np is False:
+        _np = None
+        if os.environ.get("DOPAMINE_NUMPY", "1") != "0":
+            try:
+                import numpy
+                _np = numpy
+            except ImportError:
+                pass
+    return _np
+
+# Prize tiers are data: a weight, a payout range and a "kind" that decides how
+# the UI presents them (win / jackpot / lose). The table is compiled once into
+# a Walker/Vose alias table, so each draw is O(1) however many tiers there are.
+# It can be overridden with a JSON list stored under the PRIZE_TABLE setting.
+
+NUMPY_MIN_BATCH = 1000  # below this, the plain-Python path is faster
+KINDS = ("win", "jackpot", "lose")
+
+
+class Tier(NamedTuple):
+    name: str
+    weight: float
+    prize_min: int
+    prize_max: int
+    kind: str = "win"   # "win" | "jackpot" | "lose"
+
+
+# 49% win $1-$20, 2% jackpot ($100), 49% "keep working"
+DEFAULT_TIERS = (
+    Tier("win", 0.49, 1, 20, "win"),
+    Tier("jackpot", 0.02, 100, 100, "jackpot"),
+    Tier("lose", 0.49, 0, 0, "lose"),
+)
+
+
+class Roll(NamedTuple):
+    index: int      # 0-based position within its batch
+    outcome: str    # tier kind: "win" | "jackpot" | "lose"
+    prize: int      # dollars; 0 for "lose"
+    tier: str = ""  # tier name from the prize table
+
+
+# ---------------- alias table ----------------
+class AliasTable:
+    """Vose's alias method: O(n) build, O(1) sample."""
+
+    def __init__(self, weights):
+        weights = [float(w) for w in weights]
+        total = sum(weights)
+        if not weights or total <= 0 or min(weights) < 0:
+            raise ValueError("weights must be non-negative with a positive sum")
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        prob, alias = [0.0] * n, list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:  # leftovers are 1.0 up to rounding
+            prob[i] = 1.0
+        self.n, self.prob, self.alias = n, prob, alias
+        self._np = None
+
+    def sample(self, rng=random) -> int:
+        i = int(rng.random() * self.n)
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+    def sample_array(self, size: int, gen):
+        """Vectorized draw of `size` indices with a numpy Generator."""
+        np = numpy_module()
+        if self._np is None:
+            self._np = (np.asarray(self.prob), np.asarray(self.alias))
+        prob, alias = self._np
+        idx = gen.integers(0, self.n, size=size)
+        return np.where(gen.random(size) < prob[idx], idx, alias[idx])
+
+
+# ---------------- prize table ----------------
+class PrizeTable:
+    """Tiers compiled into an alias table; shared by single and multi rolls."""
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = tuple(tiers)
+        self.alias = AliasTable([t.weight for t in self.tiers])
+
+    def draw(self, rng=random, index: int = 0) -> Roll:
+        t = self.tiers[self.alias.sample(rng)]
+        prize = t.prize_min if t.prize_min == t.prize_max else rng.randint(t.prize_min, t.prize_max)
+        return Roll(index, t.kind, prize, t.name)
+
+    def draw_many(self, n: int, rng=random) -> list[Roll]:
+        n = max(0, int(n))
+        np = numpy_module() if n >= NUMPY_MIN_BATCH and rng is random else None
+        if np is not None:
+            idx, prizes = self.draw_arrays(n, np.random.default_rng())
+            tiers = self.tiers
+            return [Roll(i, tiers[t].kind, int(p), tiers[t].name)
+                    for i, (t, p) in enumerate(zip(idx.tolist(), prizes.tolist()))]
+        return [self.draw(rng, i) for i in range(n)]
+
+    def draw_arrays(self, n: int, gen):
+        """numpy bulk draw: (tier index array, prize array). Requires numpy."""
+        np = numpy_module()
+        if np is None:
+            raise RuntimeError("numpy is required for draw_arrays")
+        idx = self.alias.sample_array(n, gen)
+        prizes = np.zeros(n, dtype=np.int64)
+        for k, t in enumerate(self.tiers):
+            if t.prize_max <= 0:
+                continue
+            mask = idx == k
+            m = int(mask.sum())
+            if m:
+                prizes[mask] = gen.integers(t.prize_min, t.prize_max + 1, size=m)
+        return idx, prizes
+
+    def expected_prize(self) -> float:
+        total = sum(t.weight for t in self.tiers)
+        return sum(t.weight / total * (t.prize_min + t.prize_max) / 2 for t in self.tiers)
+
+    def to_json(self) -> str:
+        return json.dumps([{"name": t.name, "weight": t.weight, "min": t.prize_min,
+                            "max": t.prize_max, "kind": t.kind} for t in self.tiers])
+
+    @classmethod
+    def from_json(cls, text: str) -> "PrizeTable":
+        tiers = []
+        for d in json.loads(text):
+            lo, hi = int(d.get("min", 0)), int(d.get("max", d.get("min", 0)))
+            if hi < lo:
+                raise ValueError(f"tier {d.get('name')!r}: max < min")
+            kind = d.get("kind") or ("lose" if hi <= 0 else "win")
+            if kind not in KINDS:
+                raise ValueError(f"tier {d.get('name')!r}: unknown kind {kind!r}")
+            tiers.append(Tier(str(d["name"]), float(d["weight"]), lo, hi, kind))
+        return cls(tiers)
+
+
+def load_prize_table(store) -> PrizeTable:
+    """PRIZE_TABLE setting if present and valid, else the default schedule."""
+    try:
+        text = store.get_setting("PRIZE_TABLE")
+        if text:
+            return PrizeTable.from_json(text)
+    except Exception:
+        pass
+    return PrizeTable()
+
+
+_table = PrizeTable()
+
+def set_prize_table(table: PrizeTable) -> None:
+    global _table
+    _table = table
+
+def get_prize_table() -> PrizeTable:
+    return _table
+
+
+# ---------------- draws ----------------
+def draw_many(n: int, rng=random) -> list[Roll]:
+    """Draw n results in one call (no chance bookkeeping)."""
+    return _table.draw_many(n, rng)
+
+
+def draw_one(rng=random) -> Roll:
+    return _table.draw(rng)
+
+
+def roll_batch(n: int, counter, rng=random) -> list[Roll]:
+    """Draw n rolls and pay for all of them with a single deduction.
+
+    `counter` is a store.ChanceCounter. If the balance is short, only the
+    first `balance` rolls are kept (and paid for).
+    """
+    rolls = draw_many(n, rng)
+    used = counter.use_for_rolls([(r.tier or r.outcome, r.prize) for r in rolls])
+    return rolls[:used]
+
+
+def summarize(rolls) -> dict:
+    """Totals for a batch: counts per outcome and dollars won."""
+    out = {"rolls": len(rolls), "win": 0, "jackpot": 0, "lose": 0, "total_prize": 0}
+    for r in rolls:
+        out[r.outcome] = out.get(r.outcome, 0) + 1
+        out["total_prize"] += r.prize
+    return out
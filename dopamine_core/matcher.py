@@ -0,0 +1,144 @@
+import fnmatch, os, re, time
+
+# What counts as "the target is running". A target is a string; a plain exe
+# name keeps its old meaning, richer rules use prefixed clauses joined by " & ":
+#
+#   chrome.exe                                   exact name (case-insensitive)
+#   path:C:\Program Files\Google\...\chrome.exe  full exe path
+#   cmd:*--profile-directory=Work*               glob on the command line
+#   cmdre:--profile-directory="?Work\b           regex search on the command line
+#   parent:explorer.exe                          parent process name
+#   javaw.exe & cmd:*minecraft*                  all clauses must hold
+#
+# Rules are compiled once into a name -> rules index. Clauses beyond the name
+# need exe / cmdline / parent, which are read once per (pid, create_time, name)
+# and cached for the life of the process. A failed read (transient error,
+# access denied) is not cached; it is retried after DETAILS_RETRY seconds.
+
+RULE_SEP = " & "
+DETAILS_RETRY = 5.0
+KINDS = ("name", "path", "cmd", "cmdre", "parent")
+
+
+def _norm_path(p: str) -> str:
+    return os.path.normcase(os.path.normpath(p)) if p else ""
+
+
+class Rule:
+    """One compiled target: an optional name key plus clauses needing details."""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.name = None     # lower-case exe name, if the rule pins one
+        self.checks = []     # (kind, value) evaluated against process details; cmd: a match function
+        for part in target.split(RULE_SEP):
+            part = part.strip()
+            kind, sep, value = part.partition(":")
+            if not sep or kind not in KINDS or len(kind) == 1:   # "C:\..." is not a kind
+                kind, value = "name", part
+            if not value:
+                raise ValueError(f"empty {kind} clause in {target!r}")
+            if kind == "name":
+                self._set_name(value)
+            elif kind == "path":
+                self._set_name(os.path.basename(value.replace("\\", "/")))
+                self.checks.append(("path", _norm_path(value)))
+            elif kind == "cmd":
+                self.checks.append(("cmd", re.compile(fnmatch.translate(value), re.IGNORECASE).fullmatch))
+            elif kind == "cmdre":
+                try:
+                    self.checks.append(("cmd", re.compile(value).search))
+                except re.error as e:
+                    raise ValueError(f"bad regex in {target!r}: {e}") from None
+            else:
+                self.checks.append(("parent", value.lower()))
+
+    def _set_name(self, name: str):
+        name = name.lower()
+        if self.name not in (None, name):
+            raise ValueError(f"conflicting names in {self.target!r}")
+        self.name = name
+
+    def matches(self, details) -> bool:
+        """Evaluate the detail clauses (the name was matched by the index)."""
+        if details is None:
+            return False
+        for kind, value in self.checks:
+            if kind == "path":
+                if _norm_path(details.get("exe", "")) != value:
+                    return False
+            elif kind == "cmd":
+                if not value(details.get("cmdline", "")):
+                    return False
+            elif details.get("parent", "").lower() != value:
+                return False
+        return True
+
+
+class Matcher:
+    """Targets compiled into lookups; match() is a dict hit for plain names."""
+
+    def __init__(self, targets):
+        self.targets = []
+        self.errors = {}       # target -> message; such targets never match
+        self.plain = {}        # name -> (targets matched by name alone)
+        self.by_name = {}      # name -> [rules with detail clauses]
+        self.wildcard = []     # rules without a name: checked against every process
+        self._identity = {}    # (pid, create_time, name) -> matched detail-rule targets
+        self._failed = {}      # (pid, create_time, name) -> monotonic time to retry details
+        self._seen = set()
+        self.details_reads = 0
+        for t in targets:
+            self.targets.append(t)
+            try:
+                rule = Rule(t)
+            except ValueError as e:
+                self.errors[t] = str(e)
+                continue
+            if rule.name is None:
+                self.wildcard.append(rule)
+            elif not rule.checks:
+                self.plain[rule.name] = self.plain.get(rule.name, ()) + (t,)
+            else:
+                self.by_name.setdefault(rule.name, []).append(rule)
+
+    def match(self, pid: int, name: str, ctime, procs) -> tuple:
+        """Targets this process counts for."""
+        key_name = name.lower()
+        plain = self.plain.get(key_name, ())
+        rules = self.by_name.get(key_name)
+        if not rules and not self.wildcard:
+            return plain
+        ident = (pid, ctime, key_name)   # exec() keeps pid and ctime, not the name
+        self._seen.add(ident)
+        hit = self._identity.get(ident)
+        if hit is None:
+            get_details = getattr(procs, "details", None)
+            if get_details is None:
+                self._identity[ident] = ()   # the backend can't tell: never matches
+                return plain
+            now = time.monotonic()
+            if self._failed.get(ident, 0.0) > now:
+                return plain
+            self.details_reads += 1
+            try:
+                details = get_details(pid)
+            except Exception:
+                details = None
+            if details is None:
+                self._failed[ident] = now + DETAILS_RETRY
+                return plain
+            self._failed.pop(ident, None)
+            hit = tuple(r.target for r in (rules or []) + self.wildcard if r.matches(details))
+            self._identity[ident] = hit
+        return plain + hit if plain else hit
+
+    def begin_scan(self) -> None:
+        self._seen = set()
+
+    def end_scan(self) -> None:
+        """Forget identities of processes that are gone (after a full scan)."""
+        if len(self._identity) != len(self._seen):
+            self._identity = {k: v for k, v in self._identity.items() if k in self._seen}
+        if self._failed:
+            self._failed = {k: v for k, v in self._failed.items() if k in self._seen}
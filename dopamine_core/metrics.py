@@ -0,0 +1,148 @@
+"""Opt-in tracker metrics in Prometheus text format.
+
+    DOPAMINE_METRICS=1            collect; rewrite APP_DIR/metrics.prom every 15 s
+    DOPAMINE_METRICS_FILE=path    write somewhere else
+    DOPAMINE_METRICS_PORT=9464    also serve GET /metrics on 127.0.0.1
+
+Histograms have fixed buckets (memory never grows). When DOPAMINE_METRICS
+is unset, tracker_metrics() returns None and the tracker loop skips every
+timing call, so disabled metrics cost one `is None` test per phase.
+"""
+import bisect, os, threading
+
+from .paths import APP_DIR
+from .scheduler import get_scheduler
+
+EXPORT_INTERVAL = 15.0   # seconds between metrics.prom rewrites
+
+# seconds: 0.1 ms .. 1 s
+TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self.value = 0
+
+    def inc(self, n=1) -> None:
+        self.value += n
+
+    def render(self) -> list:
+        return [f"{self.name} {self.value}"]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets=TIME_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def render(self) -> list:
+        lines, cum = [], 0
+        for le, c in zip(self.buckets, self.counts):
+            cum += c
+            lines.append(f'{self.name}_bucket{{le="{le:g}"}} {cum}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum:.6f}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class TrackerMetrics:
+    """Everything run_tracker records; written from the tracker thread only."""
+
+    def __init__(self):
+        p = "dopamine_tracker_"
+        self.tick = Histogram(p + "tick_seconds", "Whole tracker tick (excluding the sleep).")
+        self.scan = Histogram(p + "scan_seconds", "Process discovery per tick.")
+        self.save = Histogram(p + "progress_save_seconds", "Carry-over update + flush per tick.")
+        self.award = Histogram(p + "award_seconds", "Converting tracked seconds into chances.")
+        self.ui = Histogram(p + "ui_dispatch_seconds", "on_tick / on_chance callbacks per tick.")
+        self.scans = Counter(p + "scans_total", "Scan ticks.")
+        self.full_scans = Counter(p + "full_scans_total", "Full process-table walks.")
+        self.procs = Counter(p + "procs_examined_total", "Processes looked at by scans.")
+        self.matches = Counter(p + "matches_total", "Running targets seen, summed over ticks.")
+        self.chances = Counter(p + "chances_awarded_total", "Chances awarded.")
+        self.writes = Counter(p + "progress_writes_total", "Carry-over flush transactions.")
+
+    def all(self) -> list:
+        return [v for v in vars(self).values() if isinstance(v, (Counter, Histogram))]
+
+
+def render(metrics=None) -> str:
+    """Prometheus text exposition of `metrics` (default: the tracker's)."""
+    metrics = metrics or _metrics
+    if metrics is None:
+        return ""
+    lines = []
+    for m in metrics.all():
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------- exporters ----------------
+def write_file(path: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)   # scrapers never see a half-written file
+
+def _serve_http(port: int):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+    except OSError:
+        pass   # port taken: the file exporter still runs
+
+
+# ---------------- switch ----------------
+_metrics = None
+_lock = threading.Lock()
+
+def enabled() -> bool:
+    return os.environ.get("DOPAMINE_METRICS", "0") not in ("", "0")
+
+def tracker_metrics():
+    """The process-wide TrackerMetrics (exporters started), or None if disabled."""
+    global _metrics
+    if not enabled():
+        return None
+    with _lock:
+        if _metrics is None:
+            _metrics = TrackerMetrics()
+            path = os.environ.get("DOPAMINE_METRICS_FILE") or os.path.join(APP_DIR, "metrics.prom")
+            # a job on the shared scheduler, not a thread of its own
+            get_scheduler().every(EXPORT_INTERVAL, lambda: write_file(path), name="metrics-file")
+            port = os.environ.get("DOPAMINE_METRICS_PORT")
+            if port:
+                threading.Thread(target=_serve_http, args=(int(port),), name="metrics-http", daemon=True).start()
+        return _metrics
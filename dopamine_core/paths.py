@@ -0,0 +1,84 @@
+import os, sys, shutil
+from types import MappingProxyType
+
+APP_NAME = "DopamineLottery"
+
+# Stable, user-writable folder (persists across reboots & onefile runs)
+def _app_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    path = os.path.join(base, APP_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+APP_DIR = _app_dir()
+
+# repo / install root (one level above this package)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ---------------- asset registry ----------------
+# Known assets are resolved once into a read-only table; lookups never touch
+# the filesystem. ensure_asset() rebuilds the table after copying a file.
+KNOWN_ASSETS = ("good.wav", "cheer.wav", "icon2.ico", "github.png")
+
+_assets = None              # MappingProxyType: name -> path | None
+_reported_missing = set()
+
+
+def _search_dirs() -> list:
+    """APP_DIR, install dir, PyInstaller _MEIPASS, and CWD (in that order)."""
+    dirs = [APP_DIR, BASE_DIR]
+    if getattr(sys, "_MEIPASS", None):
+        dirs.append(sys._MEIPASS)
+    dirs.append(os.getcwd())
+    return dirs
+
+def _probe(name: str, dirs) -> str | None:
+    for d in dirs:
+        p = os.path.join(d, name)
+        if os.path.exists(p):
+            return p
+    return None
+
+def _resolve(names) -> MappingProxyType:
+    dirs = _search_dirs()
+    table = {n: _probe(n, dirs) for n in names}
+    for n, p in table.items():
+        if p is None and n not in _reported_missing:
+            _reported_missing.add(n)
+            print(f"{APP_NAME}: asset not found: {n}", file=sys.stderr)
+    return MappingProxyType(table)
+
+def asset_table() -> MappingProxyType:
+    """The resolved {name: path | None} table, built on first use."""
+    global _assets
+    if _assets is None:
+        _assets = _resolve(KNOWN_ASSETS)
+    return _assets
+
+def invalidate_assets() -> None:
+    """Drop the table; the next lookup resolves everything again."""
+    global _assets
+    _assets = None
+
+def find_asset(name: str) -> str | None:
+    """Resolved path of an asset, or None if it is missing."""
+    table = asset_table()
+    if name in table:
+        return table[name]
+    global _assets
+    _assets = _resolve(tuple(table) + (name,))   # unknown name: add it once
+    return _assets[name]
+
+def ensure_asset(name: str):
+    """If bundled file exists but not in APP_DIR, copy it there once."""
+    try:
+        src = find_asset(name)
+        if not src:
+            return
+        dst = os.path.join(APP_DIR, name)
+        if not os.path.exists(dst):
+            shutil.copy2(src, dst)
+            invalidate_assets()   # APP_DIR copy now wins
+    except Exception:
+        pass
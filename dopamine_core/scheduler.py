@@ -0,0 +1,263 @@
+import atexit, random, threading, time
+
+# One thread runs every periodic / delayed job of the process (tracker ticks,
+# metrics export, asset warm-up, ...) instead of a thread or a sleep loop per
+# job. Jobs sit in a hashed timer wheel: `slots` buckets of `tick` seconds,
+# a job due at tick T lives in bucket T % slots until the wheel reaches T.
+# Adding, cancelling and rescheduling are O(1); the thread sleeps until the
+# next occupied bucket, so an idle wheel costs nothing.
+#
+# Jobs run on the scheduler thread and should be short; anything that blocks
+# (sound playback, sockets) keeps its own worker. Per-job run counts, cost and
+# lateness are in stats().
+
+TICK = 0.05      # wheel resolution, seconds
+SLOTS = 512      # one revolution: 25.6 s
+
+
+class Job:
+    """A scheduled callable; cancel() / run_soon() are safe from any thread."""
+
+    def __init__(self, scheduler, fn, name: str, interval, jitter: float, coalesce: bool, key=None):
+        self.scheduler, self.fn, self.name = scheduler, fn, name
+        self.interval = interval    # None: one-shot
+        self.jitter = jitter        # fraction of the delay, spreads recurring jobs
+        self.coalesce = coalesce    # late: skip the missed runs instead of catching up
+        self.key = key
+        self.due = 0.0              # monotonic time it should run
+        self.due_tick = 0
+        self.cancelled = False
+        self._running = False
+        self._again = False         # run_soon() while running
+        self._done = threading.Event()
+        self.stats = {"runs": 0, "errors": 0, "skipped": 0, "total_s": 0.0, "max_s": 0.0,
+                      "max_late_s": 0.0}
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        self.scheduler._cancel(self)
+
+    def run_soon(self) -> None:
+        """Run at the next tick instead of waiting out the current delay."""
+        self.scheduler._reschedule(self, 0.0)
+
+    def wait(self, timeout=None) -> bool:
+        """Block until the job has finished for good (one-shot ran, or cancelled)."""
+        return self._done.wait(timeout)
+
+
+class Scheduler:
+    def __init__(self, tick: float = TICK, slots: int = SLOTS, name: str = "scheduler"):
+        self.tick, self.slots, self.name = tick, slots, name
+        self._wheel = [set() for _ in range(slots)]
+        self._count = 0              # jobs in the wheel
+        self._keyed = {}             # key -> pending call_soon job
+        self._jobs = []              # recurring jobs, for stats()
+        self._cv = threading.Condition()
+        self._t0 = time.monotonic()
+        self._cursor = 0             # next tick to process
+        self._thread = None
+        self._stopping = False
+
+    # ---------------- API ----------------
+    def every(self, interval: float, fn, *, name=None, jitter: float = 0.0, coalesce: bool = True,
+              delay=None) -> Job:
+        """Run fn() every `interval` seconds (first run after `delay`, default one interval).
+
+        fn may return a number to set the delay before its next run.
+        """
+        job = Job(self, fn, name or getattr(fn, "__name__", "job"), float(interval), jitter, coalesce)
+        with self._cv:
+            self._jobs.append(job)
+            self._insert(job, time.monotonic() + (interval if delay is None else delay))
+        return job
+
+    def once(self, delay: float, fn, *, name=None) -> Job:
+        job = Job(self, fn, name or getattr(fn, "__name__", "job"), None, 0.0, True)
+        with self._cv:
+            self._insert(job, time.monotonic() + delay)
+        return job
+
+    def call_soon(self, fn, *, key=None, name=None) -> Job:
+        """Run fn() at the next tick; a pending call with the same key is reused."""
+        with self._cv:
+            job = self._keyed.get(key) if key is not None else None
+            if job is not None and not job.cancelled and not job._running:
+                job.fn = fn
+                job.stats["skipped"] += 1
+                return job
+            job = Job(self, fn, name or str(key or getattr(fn, "__name__", "job")), None, 0.0, True, key)
+            if key is not None:
+                self._keyed[key] = job
+            self._insert(job, time.monotonic())
+        return job
+
+    def stats(self) -> list:
+        """Per recurring job: runs, errors, skipped, total/max run time, max lateness."""
+        with self._cv:
+            self._jobs = [j for j in self._jobs if not j.cancelled]
+            return [dict(j.stats, name=j.name, interval=j.interval) for j in self._jobs]
+
+    def pending(self) -> int:
+        return self._count
+
+    def shutdown(self, wait: bool = True, timeout: float = 5.0) -> None:
+        """Stop the thread. Jobs already due (or poked to run soon) still run; later ones are dropped."""
+        with self._cv:
+            self._stopping = True
+            self._cv.notify()
+            thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    # ---------------- wheel ----------------
+    def _tick_of(self, t: float) -> int:
+        return int((t - self._t0) / self.tick + 0.999999)   # never early
+
+    def _insert(self, job: Job, due: float) -> None:
+        # caller holds _cv
+        job.due = due
+        job.due_tick = max(self._tick_of(due), self._cursor)
+        self._wheel[job.due_tick % self.slots].add(job)
+        self._count += 1
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._cv.notify()
+
+    def _remove(self, job: Job) -> bool:
+        bucket = self._wheel[job.due_tick % self.slots]
+        if job in bucket:
+            bucket.discard(job)
+            self._count -= 1
+            return True
+        return False
+
+    def _cancel(self, job: Job) -> None:
+        with self._cv:
+            job.cancelled = True
+            self._remove(job)
+            if self._keyed.get(job.key) is job:
+                del self._keyed[job.key]
+            if not job._running:
+                job._done.set()
+
+    def _reschedule(self, job: Job, delay: float) -> None:
+        with self._cv:
+            if job.cancelled:
+                return
+            if job._running:
+                job._again = True
+            elif self._remove(job):
+                self._insert(job, time.monotonic() + delay)
+
+    def _collect(self, now_tick: int) -> list:
+        """Pop the jobs due up to now_tick (caller holds _cv)."""
+        due = []
+        if now_tick - self._cursor >= self.slots:
+            buckets = self._wheel                    # fell behind a whole turn
+        else:
+            buckets = (self._wheel[t % self.slots] for t in range(self._cursor, now_tick + 1))
+        for bucket in buckets:
+            if bucket:
+                ready = [j for j in bucket if j.due_tick <= now_tick]
+                for j in ready:
+                    bucket.discard(j)
+                due.extend(ready)
+        self._count -= len(due)
+        self._cursor = now_tick + 1
+        return due
+
+    def _timeout(self):
+        """Seconds until the next occupied bucket (None: wheel empty)."""
+        if not self._count:
+            return None
+        for d in range(self.slots):
+            if self._wheel[(self._cursor + d) % self.slots]:
+                return max(0.0, self._t0 + (self._cursor + d) * self.tick - time.monotonic())
+        return None
+
+    # ---------------- thread ----------------
+    def _run(self):
+        while True:
+            with self._cv:
+                while True:
+                    now_tick = int((time.monotonic() - self._t0) / self.tick)
+                    if self._stopping:
+                        now_tick = max(now_tick, self._cursor)   # run_soon() / call_soon() count as due
+                    due = self._collect(now_tick)
+                    if due or self._stopping:
+                        break
+                    self._cv.wait(self._timeout())
+                for job in due:
+                    job._running = True
+                    if self._keyed.get(job.key) is job:
+                        del self._keyed[job.key]
+            due.sort(key=lambda j: j.due)
+            for job in due:
+                self._run_job(job)
+            if self._stopping:
+                with self._cv:
+                    if not any(j.due_tick <= self._cursor for b in self._wheel for j in b):
+                        self._thread = None
+                        return
+
+    def _run_job(self, job: Job) -> None:
+        st = job.stats
+        start = time.monotonic()
+        late = start - job.due
+        if late > st["max_late_s"]:
+            st["max_late_s"] = late
+        result = None
+        try:
+            result = job.fn()
+        except Exception:
+            st["errors"] += 1
+        cost = time.monotonic() - start
+        st["runs"] += 1
+        st["total_s"] += cost
+        if cost > st["max_s"]:
+            st["max_s"] = cost
+
+        with self._cv:
+            job._running = False
+            if job.cancelled or self._stopping:
+                job.cancelled = True
+                job._done.set()
+                return
+            if job._again:                # poked while running
+                job._again = False
+                self._insert(job, time.monotonic())
+                return
+            if job.interval is None:
+                job.cancelled = True
+                job._done.set()
+                return
+            delay = result if isinstance(result, (int, float)) and not isinstance(result, bool) else job.interval
+            if job.jitter:
+                delay *= 1.0 + random.uniform(-job.jitter, job.jitter)
+            now = time.monotonic()
+            nxt = job.due + delay
+            if nxt < now:
+                if job.coalesce:
+                    missed = int((now - nxt) // delay) + 1 if delay > 0 else 0
+                    st["skipped"] += missed
+                    nxt = now + delay if delay > 0 else now
+                # else: fixed rate, catch up one run per tick
+            self._insert(job, nxt)
+
+
+_scheduler = None
+_lock = threading.Lock()
+
+def get_scheduler() -> Scheduler:
+    """The process-wide scheduler; its thread starts with the first job."""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+            atexit.register(_scheduler.shutdown, True, 2.0)   # let a running job finish
+        return _scheduler
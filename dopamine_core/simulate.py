@@ -0,0 +1,314 @@
+"""Monte Carlo odds simulator for the reward schedule (no Tk / winsound needed).
+
+    python -m dopamine_core.simulate --rolls 100000000 --rolls-per-multi 8
+    python -m dopamine_core.simulate --prize-table table.json --time-required 1800 --json
+
+Rolls are drawn in fixed-size chunks (bounded memory) across a process
+pool. Each chunk returns only aggregates, which are merged in order so
+jackpot gaps and losing streaks that span chunk boundaries are exact.
+Uses numpy when installed; otherwise a much slower pure-Python path.
+"""
+import argparse, json, os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from .lottery import PrizeTable, numpy_module
+
+np = numpy_module()   # this tool wants the vectorized path when it can have it
+
+GAP_BUCKETS = 5000      # jackpot gaps >= this land in the last bucket
+STREAK_BUCKETS = 500    # losing streaks >= this land in the last bucket
+
+
+# ---------------- per-chunk aggregates ----------------
+def _empty_stats(n: int) -> dict:
+    return {
+        "n": n, "sum": 0, "sumsq": 0, "jackpots": 0, "wins": 0,
+        # jackpot positions inside the chunk
+        "jp_first": None, "jp_last": None, "jp_gaps": [0] * (GAP_BUCKETS + 1),
+        # losing runs touching the chunk edges are merged later
+        "lose_prefix": 0, "lose_suffix": 0, "lose_runs": [0] * (STREAK_BUCKETS + 1),
+        # multi-roll blocks
+        "blocks": 0, "block_sum": 0, "block_sumsq": 0, "blocks_empty": 0, "blocks_jackpot": 0,
+    }
+
+
+def _chunk_numpy(table: PrizeTable, n: int, seed, per_multi: int) -> dict:
+    gen = np.random.default_rng(seed)
+    idx, prizes = table.draw_arrays(n, gen)
+    kinds = np.array([t.kind for t in table.tiers])
+    kind = kinds[idx]
+    is_jp = kind == "jackpot"
+    is_lose = kind == "lose"
+
+    st = _empty_stats(n)
+    st["sum"] = int(prizes.sum())
+    st["sumsq"] = int(np.dot(prizes, prizes))
+    st["jackpots"] = int(is_jp.sum())
+    st["wins"] = int((kind == "win").sum())
+
+    pos = np.flatnonzero(is_jp)
+    if pos.size:
+        st["jp_first"], st["jp_last"] = int(pos[0]), int(pos[-1])
+        gaps = np.minimum(np.diff(pos), GAP_BUCKETS)
+        st["jp_gaps"] = np.bincount(gaps, minlength=GAP_BUCKETS + 1).tolist()
+
+    edges = np.diff(np.concatenate(([0], is_lose.view(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    if lengths.size:
+        if starts[0] == 0:
+            st["lose_prefix"] = int(lengths[0])
+        if ends[-1] == n:
+            st["lose_suffix"] = int(lengths[-1])
+        inner = lengths[(starts > 0) & (ends < n)]
+        st["lose_runs"] = np.bincount(np.minimum(inner, STREAK_BUCKETS),
+                                      minlength=STREAK_BUCKETS + 1).tolist()
+
+    m = (n // per_multi) * per_multi
+    if m:
+        blocks = prizes[:m].reshape(-1, per_multi).sum(axis=1)
+        st["blocks"] = int(blocks.size)
+        st["block_sum"] = int(blocks.sum())
+        st["block_sumsq"] = int(np.dot(blocks, blocks))
+        st["blocks_empty"] = int((blocks == 0).sum())
+        st["blocks_jackpot"] = int(is_jp[:m].reshape(-1, per_multi).any(axis=1).sum())
+    return st
+
+
+def _chunk_python(table: PrizeTable, n: int, seed, per_multi: int) -> dict:
+    rolls = table.draw_many(n, random.Random(seed))
+    st = _empty_stats(n)
+    run, prev_jp, block, block_jp = 0, None, 0, False
+    for i, r in enumerate(rolls):
+        st["sum"] += r.prize
+        st["sumsq"] += r.prize * r.prize
+        if r.outcome == "jackpot":
+            st["jackpots"] += 1
+            if prev_jp is None:
+                st["jp_first"] = i
+            else:
+                st["jp_gaps"][min(i - prev_jp, GAP_BUCKETS)] += 1
+            prev_jp = st["jp_last"] = i
+        elif r.outcome == "win":
+            st["wins"] += 1
+        if r.outcome == "lose":
+            run += 1
+        else:
+            if run:
+                if run == i:  # run started at index 0
+                    st["lose_prefix"] = run
+                else:
+                    st["lose_runs"][min(run, STREAK_BUCKETS)] += 1
+            run = 0
+        block += r.prize
+        block_jp = block_jp or r.outcome == "jackpot"
+        if (i + 1) % per_multi == 0:
+            st["blocks"] += 1
+            st["block_sum"] += block
+            st["block_sumsq"] += block * block
+            st["blocks_empty"] += block == 0
+            st["blocks_jackpot"] += block_jp
+            block, block_jp = 0, False
+    if run:
+        if run == n:
+            st["lose_prefix"] = run
+        st["lose_suffix"] = run
+    return st
+
+
+def _run_chunk(args) -> dict:
+    table_json, n, seed, per_multi = args
+    table = PrizeTable.from_json(table_json)
+    if np is not None:
+        return _chunk_numpy(table, n, seed, per_multi)
+    return _chunk_python(table, n, seed, per_multi)
+
+
+# ---------------- merge ----------------
+class _Merger:
+    """Folds chunk aggregates in order, stitching runs across chunk edges."""
+
+    def __init__(self):
+        self.t = _empty_stats(0)
+        self.jp_carry = None   # rolls since the last jackpot (None: none yet)
+        self.lose_open = 0     # losing run still open at the end of the last chunk
+        self.max_streak = 0
+        self.max_gap = 0
+
+    def add(self, st: dict) -> None:
+        t = self.t
+        for k in ("n", "sum", "sumsq", "jackpots", "wins", "blocks", "block_sum",
+                  "block_sumsq", "blocks_empty", "blocks_jackpot"):
+            t[k] += st[k]
+        for i, c in enumerate(st["jp_gaps"]):
+            t["jp_gaps"][i] += c
+            if c:
+                self.max_gap = max(self.max_gap, i)
+
+        n = st["n"]
+        if st["jp_first"] is None:
+            if self.jp_carry is not None:
+                self.jp_carry += n
+        else:
+            if self.jp_carry is not None:
+                gap = self.jp_carry + st["jp_first"] + 1
+                t["jp_gaps"][min(gap, GAP_BUCKETS)] += 1
+                self.max_gap = max(self.max_gap, gap)
+            self.jp_carry = n - 1 - st["jp_last"]
+
+        if st["lose_prefix"] == n:          # whole chunk was one losing run
+            self.lose_open += n
+        else:
+            self._close_run(self.lose_open + st["lose_prefix"])
+            for i, c in enumerate(st["lose_runs"]):
+                t["lose_runs"][i] += c
+                if c:
+                    self.max_streak = max(self.max_streak, i)
+            self.lose_open = st["lose_suffix"]
+
+    def _close_run(self, run: int) -> None:
+        if run:
+            self.t["lose_runs"][min(run, STREAK_BUCKETS)] += 1
+            self.max_streak = max(self.max_streak, run)
+
+    def finish(self) -> dict:
+        self._close_run(self.lose_open)
+        self.lose_open = 0
+        return self.t
+
+
+def _hist_percentile(hist, q: float):
+    total = sum(hist)
+    if not total:
+        return None
+    want, acc = q * total, 0
+    for i, c in enumerate(hist):
+        acc += c
+        if acc >= want:
+            return i
+    return len(hist) - 1
+
+
+def _hist_mean(hist):
+    total = sum(hist)
+    return sum(i * c for i, c in enumerate(hist)) / total if total else None
+
+
+# ---------------- driver ----------------
+def simulate(table: PrizeTable, rolls: int, *, chunk: int = 1_000_000, workers: int | None = None,
+             seed: int | None = None, rolls_per_multi: int = 10, time_required: int = 3600) -> dict:
+    per_multi = max(1, int(rolls_per_multi))
+    chunk = max(per_multi, (int(chunk) // per_multi) * per_multi)  # blocks never straddle chunks
+    sizes = [chunk] * (rolls // chunk) + ([rolls % chunk] if rolls % chunk else [])
+    if np is not None:
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    else:
+        base = seed if seed is not None else random.randrange(2 ** 32)
+        seeds = [base * 1_000_003 + i for i in range(len(sizes))]
+    jobs = [(table.to_json(), n, s, per_multi) for n, s in zip(sizes, seeds)]
+
+    merger = _Merger()
+    t0 = time.perf_counter()
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            merger.add(_run_chunk(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for st in pool.map(_run_chunk, jobs):   # map keeps chunk order
+                merger.add(st)
+    elapsed = time.perf_counter() - t0
+    t = merger.finish()
+
+    n = t["n"] or 1
+    mean = t["sum"] / n
+    var = t["sumsq"] / n - mean * mean
+    per_hour = 3600.0 / float(time_required)
+    blocks = t["blocks"] or 1
+    b_mean = t["block_sum"] / blocks
+    gap_mean = _hist_mean(t["jp_gaps"])
+    return {
+        "rolls": t["n"],
+        "seconds": elapsed,
+        "rolls_per_second": t["n"] / elapsed if elapsed else None,
+        "backend": "numpy" if np is not None else "python",
+        "mean_payout_per_roll": mean,
+        "variance_per_roll": var,
+        "expected_payout_per_hour": mean * per_hour,
+        "variance_per_hour": var * per_hour,
+        "win_rate": t["wins"] / n,
+        "jackpot_rate": t["jackpots"] / n,
+        "jackpot_gap": {
+            "count": sum(t["jp_gaps"]),
+            "mean_rolls": gap_mean,
+            "mean_hours": gap_mean / per_hour if gap_mean is not None else None,
+            "p50": _hist_percentile(t["jp_gaps"], 0.50),
+            "p90": _hist_percentile(t["jp_gaps"], 0.90),
+            "p99": _hist_percentile(t["jp_gaps"], 0.99),
+            "max": merger.max_gap,
+            "capped_at": GAP_BUCKETS,
+        },
+        "losing_streak": {
+            "count": sum(t["lose_runs"]),
+            "mean": _hist_mean(t["lose_runs"]),
+            "p99": _hist_percentile(t["lose_runs"], 0.99),
+            "max": merger.max_streak,
+        },
+        "multi": {
+            "rolls_per_multi": per_multi,
+            "sessions": t["blocks"],
+            "mean_payout": b_mean,
+            "std_payout": max(0.0, t["block_sumsq"] / blocks - b_mean * b_mean) ** 0.5,
+            "p_empty": t["blocks_empty"] / blocks,
+            "p_jackpot": t["blocks_jackpot"] / blocks,
+        },
+    }
+
+
+def _print_report(r: dict) -> None:
+    jg, ls, mu = r["jackpot_gap"], r["losing_streak"], r["multi"]
+    print(f"rolls:               {r['rolls']:,} in {r['seconds']:.2f}s "
+          f"({r['rolls_per_second']:,.0f} rolls/s, {r['backend']})")
+    print(f"payout / roll:       ${r['mean_payout_per_roll']:.4f}  (var {r['variance_per_roll']:.2f})")
+    print(f"payout / hour:       ${r['expected_payout_per_hour']:.4f}  (var {r['variance_per_hour']:.2f})")
+    print(f"win / jackpot rate:  {r['win_rate']:.4%} / {r['jackpot_rate']:.4%}")
+    print(f"jackpot gap (rolls): mean {jg['mean_rolls']}, p50 {jg['p50']}, p90 {jg['p90']}, "
+          f"p99 {jg['p99']}, max {jg['max']}")
+    print(f"losing streak:       mean {ls['mean']}, p99 {ls['p99']}, max {ls['max']}")
+    print(f"multi x{mu['rolls_per_multi']}:            mean ${mu['mean_payout']:.2f} "
+          f"(std {mu['std_payout']:.2f}), empty {mu['p_empty']:.4%}, jackpot {mu['p_jackpot']:.4%}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Simulate the Dopamine Lottery reward schedule.")
+    ap.add_argument("--rolls", type=float, default=1e7, help="number of rolls (e.g. 1e9)")
+    ap.add_argument("--chunk", type=int, default=1_000_000, help="rolls per worker chunk")
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: CPUs)")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--rolls-per-multi", type=int, default=10)
+    ap.add_argument("--time-required", type=int, default=3600, help="tracked seconds per chance")
+    ap.add_argument("--prize-table", default=None,
+                    help="JSON file (or inline JSON) in the PRIZE_TABLE setting format")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args(argv)
+
+    table = PrizeTable()
+    if args.prize_table:
+        text = args.prize_table
+        if os.path.exists(text):
+            with open(text, "r", encoding="utf-8") as f:
+                text = f.read()
+        table = PrizeTable.from_json(text)
+
+    report = simulate(table, int(args.rolls), chunk=args.chunk, workers=args.workers,
+                      seed=args.seed, rolls_per_multi=args.rolls_per_multi,
+                      time_required=args.time_required)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
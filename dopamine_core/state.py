@@ -0,0 +1,30 @@
+import atexit, threading
+
+from .paths import APP_DIR
+from .store import default_store, ChanceCounter, ProgressStore
+
+# Process-wide state objects, created on first use so importing the package
+# never touches the disk.
+_lock = threading.Lock()
+_chances = None
+_progress = None
+
+def get_store():
+    return default_store(APP_DIR)
+
+def get_chances() -> ChanceCounter:
+    """The authoritative in-memory chance balance for this process."""
+    global _chances
+    with _lock:
+        if _chances is None:
+            _chances = ChanceCounter(get_store())
+        return _chances
+
+def get_progress() -> ProgressStore:
+    """Write-behind carry-over seconds; flushed at interpreter exit."""
+    global _progress
+    with _lock:
+        if _progress is None:
+            _progress = ProgressStore(get_store())
+            atexit.register(_progress.close)
+        return _progress
@@ -0,0 +1,455 @@
+import os, json, sqlite3, threading, time
+from contextlib import contextmanager
+
+# One SQLite database (WAL mode) for everything that used to live in
+# chances.txt / progress.json / settings.txt / last_app.txt.
+# Every thread gets its own connection; WAL lets the UI read while the
+# tracker writes, and multi-step updates run in a single transaction.
+
+DB_NAME = "dopamine.db"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chances (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    balance INTEGER NOT NULL CHECK (balance >= 0)
+);
+CREATE TABLE IF NOT EXISTS progress (
+    exe     TEXT PRIMARY KEY,
+    seconds INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rolls (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts      REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    prize   INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO chances (id, balance) VALUES (1, 0);
+"""
+
+
+class Store:
+    """Typed accessors over the app database. Safe to share between threads."""
+
+    def __init__(self, path: str, synchronous: str = "NORMAL"):
+        self.path = path
+        self.synchronous = synchronous  # OFF | NORMAL | FULL
+        self._local = threading.local()
+        self._init_schema()
+
+    # ---------------- connection / transactions ----------------
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT, rolled back on any exception."""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _init_schema(self):
+        db = self._conn()
+        db.executescript(_SCHEMA)
+        db.execute("INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    def schema_version(self) -> int:
+        row = self._conn().execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def change_token(self) -> tuple:
+        """(mtime_ns, size) of the db and its WAL; changes on every commit."""
+        token = []
+        for p in (self.path, self.path + "-wal"):
+            try:
+                st = os.stat(p)
+                token.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                token.append(None)
+        return tuple(token)
+
+    def close(self) -> None:
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    # ---------------- chances ----------------
+    def get_chances(self) -> int:
+        return int(self._conn().execute("SELECT balance FROM chances WHERE id=1").fetchone()[0])
+
+    def set_chances(self, n: int) -> None:
+        with self.transaction() as db:
+            db.execute("UPDATE chances SET balance=? WHERE id=1", (max(0, int(n)),))
+
+    def add_chances(self, n: int = 1) -> int:
+        """Add n chances; returns the new balance."""
+        with self.transaction() as db:
+            db.execute("UPDATE chances SET balance=balance+? WHERE id=1", (int(n),))
+            return int(db.execute("SELECT balance FROM chances WHERE id=1").fetchone()[0])
+
+    def use_chances(self, n: int = 1) -> tuple[int, int]:
+        """Deduct up to n chances; returns (deducted, new balance)."""
+        with self.transaction() as db:
+            bal = int(db.execute("SELECT balance FROM chances WHERE id=1").fetchone()[0])
+            used = max(0, min(int(n), bal))
+            if used:
+                db.execute("UPDATE chances SET balance=? WHERE id=1", (bal - used,))
+            return used, bal - used
+
+    def use_chance_and_record(self, outcome: str, prize: int = 0) -> tuple[bool, int]:
+        """Deduct one chance and log the roll atomically; returns (paid, new balance).
+
+        Not paid if the balance is 0.
+        """
+        with self.transaction() as db:
+            bal = int(db.execute("SELECT balance FROM chances WHERE id=1").fetchone()[0])
+            if bal <= 0:
+                return False, bal
+            db.execute("UPDATE chances SET balance=? WHERE id=1", (bal - 1,))
+            db.execute("INSERT INTO rolls (ts, outcome, prize) VALUES (?, ?, ?)",
+                       (time.time(), outcome, int(prize)))
+            return True, bal - 1
+
+    def use_chances_and_record_many(self, rolls) -> tuple[int, int]:
+        """Pay for a batch of (outcome, prize) rolls in one transaction.
+
+        Deducts min(len(rolls), balance) chances and records that many rolls
+        (a prefix of `rolls`). Returns (number paid for, new balance).
+        """
+        rolls = list(rolls)
+        with self.transaction() as db:
+            bal = int(db.execute("SELECT balance FROM chances WHERE id=1").fetchone()[0])
+            used = max(0, min(len(rolls), bal))
+            if used:
+                now = time.time()
+                db.execute("UPDATE chances SET balance=? WHERE id=1", (bal - used,))
+                db.executemany("INSERT INTO rolls (ts, outcome, prize) VALUES (?, ?, ?)",
+                               [(now, o, int(p)) for o, p in rolls[:used]])
+            return used, bal - used
+
+    # ---------------- carry-over seconds ----------------
+    def get_progress(self, exe: str) -> int:
+        row = self._conn().execute("SELECT seconds FROM progress WHERE exe=?", (exe,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def get_all_progress(self) -> dict:
+        return {exe: int(s) for exe, s in self._conn().execute("SELECT exe, seconds FROM progress")}
+
+    def set_progress_many(self, progress: dict) -> None:
+        with self.transaction() as db:
+            db.executemany(
+                "INSERT INTO progress (exe, seconds) VALUES (?, ?) "
+                "ON CONFLICT(exe) DO UPDATE SET seconds=excluded.seconds",
+                [(exe, int(max(0, s))) for exe, s in progress.items()],
+            )
+
+    # ---------------- settings / last app ----------------
+    def get_setting(self, key: str, default: str | None = None) -> str | None:
+        row = self._conn().execute("SELECT value FROM settings WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def get_int_setting(self, key: str, default: int) -> int:
+        try:
+            return int(self.get_setting(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def set_setting(self, key: str, value) -> None:
+        with self.transaction() as db:
+            db.execute("INSERT INTO settings (key, value) VALUES (?, ?) "
+                       "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (key, str(value)))
+
+    def get_last_app(self) -> str | None:
+        return self.get_setting("last_app")
+
+    def set_last_app(self, path: str) -> None:
+        self.set_setting("last_app", path)
+
+    # ---------------- meta ----------------
+    def get_meta(self, key: str, default: str | None = None) -> str | None:
+        row = self._conn().execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def update_meta(self, key: str, fn) -> str:
+        """Store fn(current value or None) in one transaction; returns the new value.
+
+        Serializes read-modify-write between processes (e.g. journal compaction).
+        """
+        with self.transaction() as db:
+            row = db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+            value = str(fn(row[0] if row else None))
+            db.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                       "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (key, value))
+            return value
+
+    # ---------------- legacy migration ----------------
+    def migrate_legacy(self, folder: str) -> bool:
+        """Import chances.txt / progress.json / settings.txt / last_app.txt once.
+
+        The legacy files are left in place; a meta flag prevents re-import.
+        Returns True if a migration ran.
+        """
+        db = self._conn()
+        if db.execute("SELECT 1 FROM meta WHERE key='legacy_migrated'").fetchone():
+            return False
+
+        chances = _read_legacy_int(os.path.join(folder, "chances.txt"))
+        progress = _read_legacy_json(os.path.join(folder, "progress.json"))
+        settings = _read_legacy_settings(os.path.join(folder, "settings.txt"))
+        last_app = _read_legacy_last_app(os.path.join(folder, "last_app.txt"))
+        if last_app:
+            settings["last_app"] = last_app
+
+        with self.transaction() as db:
+            if db.execute("SELECT 1 FROM meta WHERE key='legacy_migrated'").fetchone():
+                return False  # another process won the race
+            db.execute("UPDATE chances SET balance=? WHERE id=1", (max(0, chances),))
+            db.executemany("INSERT OR REPLACE INTO progress (exe, seconds) VALUES (?, ?)",
+                           [(k, int(max(0, v))) for k, v in progress.items()])
+            db.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                           list(settings.items()))
+            db.execute("INSERT INTO meta VALUES ('legacy_migrated', ?)", (str(time.time()),))
+        return True
+
+
+class ChanceCounter:
+    """Authoritative in-process chance balance backed by a Store.
+
+    Reads are O(1) from memory; writes go through the store under a lock and
+    notify subscribers with the new balance. refresh_if_changed() reloads
+    only when the database files changed behind our back (another process).
+    """
+
+    def __init__(self, store: Store):
+        self.store = store
+        self._lock = threading.RLock()
+        self._subs = []
+        self._value = store.get_chances()
+        self._token = store.change_token()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def subscribe(self, callback):
+        """callback(balance) on every change; returns an unsubscribe function."""
+        with self._lock:
+            self._subs.append(callback)
+        def _unsubscribe():
+            with self._lock:
+                if callback in self._subs:
+                    self._subs.remove(callback)
+        return _unsubscribe
+
+    def _write(self, fn):
+        """Run a store write returning (result, balance) and adopt that balance.
+
+        The balance comes from the write's own transaction. If the db had
+        changed behind our back before the write, the token taken after it
+        can't be trusted to cover only our change, so reload instead.
+        """
+        # caller holds the lock
+        before = self.store.change_token()
+        result, balance = fn()
+        if before == self._token:
+            self._commit(balance)
+        else:
+            token = self.store.change_token()   # token first, then the value
+            self._commit(self.store.get_chances(), token)
+        return result
+
+    def _commit(self, new_value: int, token=None) -> None:
+        # caller holds the lock
+        self._token = token if token is not None else self.store.change_token()
+        if new_value == self._value:
+            return
+        self._value = new_value
+        for cb in list(self._subs):
+            try:
+                cb(new_value)
+            except Exception:
+                pass
+
+    def add(self, n: int = 1) -> int:
+        with self._lock:
+            self._write(lambda: (None, self.store.add_chances(n)))
+            return self._value
+
+    def use(self, n: int = 1) -> int:
+        """Deduct up to n; returns how many were deducted."""
+        with self._lock:
+            return self._write(lambda: self.store.use_chances(n))
+
+    def use_for_roll(self, outcome: str, prize: int = 0) -> bool:
+        with self._lock:
+            return self._write(lambda: self.store.use_chance_and_record(outcome, prize))
+
+    def use_for_rolls(self, rolls) -> int:
+        """Batch version of use_for_roll; returns how many rolls were paid for."""
+        with self._lock:
+            return self._write(lambda: self.store.use_chances_and_record_many(rolls))
+
+    def set(self, n: int) -> None:
+        with self._lock:
+            self._write(lambda: (self.store.set_chances(n), max(0, int(n))))
+
+    def refresh_if_changed(self) -> bool:
+        """Reload from disk if the db was modified externally. True if reloaded."""
+        with self._lock:
+            token = self.store.change_token()
+            if token == self._token:
+                return False
+            self._commit(self.store.get_chances(), token)
+            return True
+
+
+# ---------------- write-behind carry-over ----------------
+# Write-behind: the tracker updates an in-memory dict every tick; only changed
+# entries are written, in one transaction, every PROGRESS_FLUSH_INTERVAL seconds
+# (and on stop/close / chance award).
+PROGRESS_FLUSH_INTERVAL = 60.0  # seconds
+
+class ProgressStore:
+    """In-memory carry-over seconds per exe, flushed to the store in batches."""
+
+    def __init__(self, store, flush_interval: float = PROGRESS_FLUSH_INTERVAL):
+        self.store = store
+        self.flush_interval = float(flush_interval)
+        self.writes = 0            # flush transactions performed
+        self._lock = threading.Lock()
+        self._data = None          # loaded lazily
+        self._dirty = set()
+        self._last_flush = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self._data is None:
+            try:
+                self._data = self.store.get_all_progress()
+            except Exception:
+                self._data = {}
+
+    def get(self, exe_name: str) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return int(self._data.get(exe_name, 0))
+
+    def update(self, progress: dict) -> None:
+        """Set several entries; only entries whose value changed become dirty."""
+        with self._lock:
+            self._ensure_loaded()
+            for exe_name, seconds in progress.items():
+                seconds = int(max(0, seconds))
+                if self._data.get(exe_name) != seconds:
+                    self._data[exe_name] = seconds
+                    self._dirty.add(exe_name)
+
+    def set(self, exe_name: str, seconds: int) -> None:
+        self.update({exe_name: seconds})
+
+    def maybe_flush(self) -> bool:
+        """Flush if dirty and the flush interval has elapsed."""
+        if not self._dirty or time.monotonic() - self._last_flush < self.flush_interval:
+            return False
+        return self.flush()
+
+    def flush(self) -> bool:
+        """Write dirty entries now (one transaction). Returns True if written."""
+        with self._lock:
+            if not self._dirty:
+                return False
+            batch = {k: self._data[k] for k in self._dirty}
+            self._dirty.clear()
+            self._last_flush = time.monotonic()
+        try:
+            self.store.set_progress_many(batch)
+            self.writes += 1
+            return True
+        except Exception:
+            with self._lock:
+                self._dirty.update(batch)  # retry on next flush
+            return False
+
+    def reload(self) -> None:
+        """Flush, then re-read on next access (another process tracked meanwhile)."""
+        self.flush()
+        with self._lock:
+            if not self._dirty:
+                self._data = None
+
+    close = flush
+
+
+def _read_legacy_int(path: str) -> int:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except Exception:
+        return 0
+
+def _read_legacy_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {k: int(v) for k, v in json.load(f).items()}
+    except Exception:
+        return {}
+
+def _read_legacy_settings(path: str) -> dict:
+    out = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and key:
+                    out[key] = value
+    except Exception:
+        pass
+    return out
+
+def _read_legacy_last_app(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        if text.startswith("{"):  # some builds wrote {"last_app": ...}
+            text = json.loads(text).get("last_app") or ""
+        return text or None
+    except Exception:
+        return None
+
+
+# ---------------- shared instance ----------------
+_stores = {}
+_stores_lock = threading.Lock()
+
+def default_store(app_dir: str) -> Store:
+    """One Store per app folder, created (and migrated) on first use."""
+    path = os.path.join(app_dir, DB_NAME)
+    with _stores_lock:
+        st = _stores.get(path)
+        if st is None:
+            st = Store(path)
+            try:
+                st.migrate_legacy(app_dir)
+            except Exception:
+                pass
+            _stores[path] = st
+        return st
@@ -0,0 +1,468 @@
+import threading, time
+
+from . import metrics as _metrics_mod
+from .backends import get_process_backend
+from .journal import get_journal
+from .matcher import Matcher
+from .state import get_chances, get_progress
+
+TIME_REQUIRED = 60 * 60  # 1 hour
+
+# ---------------- helpers ----------------
+def fmt_hhmmss(seconds: int) -> str:
+    seconds = int(seconds)
+    h = seconds // 3600
+    m = (seconds % 3600) // 60
+    s = seconds % 60
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+# ---------------- process discovery ----------------
+# A full scan walks every process on the box; once a target is found we pin
+# its PID(s) + create_time and only re-check those on later ticks. Targets
+# that aren't running are looked for by a full scan now and then, not every tick.
+REDISCOVER_INTERVAL = 30  # seconds between full scans while every target is pinned
+ABSENT_REDISCOVER_INTERVAL = 10  # ... while some are pinned and others absent
+
+# per-tick scan cost, so the savings of the pinned path are visible
+SCAN_STATS = {
+    "ticks": 0,
+    "full_scans": 0,
+    "pin_checks": 0,
+    "procs_examined": 0,    # cumulative processes looked at
+    "last_tick_procs": 0,   # processes looked at on the most recent tick
+    "last_tick_ms": 0.0,    # wall time of the most recent scan
+}
+
+def get_scan_stats() -> dict:
+    return dict(SCAN_STATS)
+
+# ---------------- tick cadence ----------------
+# Time is credited from time.monotonic() deltas between consecutive positive
+# observations, so the scan cadence can adapt without losing accuracy: fast
+# right after a state change, backing off while nothing changes.
+MIN_SCAN_INTERVAL = 1.0       # right after a target starts / stops
+MAX_RUNNING_INTERVAL = 5.0    # every target steadily in the same state, some running
+MAX_ABSENT_INTERVAL = 10.0    # nothing running for a while
+SCAN_BACKOFF = 1.5            # interval growth per unchanged tick
+MAX_CREDIT_GAP = 3 * MAX_ABSENT_INTERVAL  # longer gaps (suspend/hibernate) earn nothing
+
+def _next_interval(interval: float, changed: bool, running: bool) -> float:
+    if changed:
+        return MIN_SCAN_INTERVAL
+    cap = MAX_RUNNING_INTERVAL if running else MAX_ABSENT_INTERVAL
+    return min(cap, interval * SCAN_BACKOFF)
+
+def _build_index(targets) -> Matcher:
+    """Compile the target rules once so a scan is O(processes)."""
+    return Matcher(t for t in targets if t)
+
+def _full_scan(index: Matcher, procs) -> tuple[dict, int]:
+    """Walk the process table once; return ({target: {pid: ctime}}, examined)."""
+    found, examined = {}, 0
+    if procs is None:
+        return found, examined
+    plain, by_name, wildcard = index.plain, index.by_name, index.wildcard
+    index.begin_scan()
+    for pid, name, ctime in procs.iter_processes():
+        examined += 1
+        lname = name.lower()
+        if wildcard or lname in by_name:
+            hits = index.match(pid, name, ctime, procs)
+        else:
+            hits = plain.get(lname)   # plain exe names: one dict hit
+        if hits:
+            for t in hits:
+                found.setdefault(t, {})[pid] = ctime
+    index.end_scan()
+    return found, examined
+
+def _check_pins(pins: dict, procs) -> dict:
+    """Keep only pinned PIDs that are still alive and were not reused.
+
+    create_time() is None on error (gone, access denied), and a PID whose
+    ctime was unknown when found can't be told from a reused one: neither
+    counts as alive, so such targets are re-found by a full scan instead.
+    """
+    alive = {}
+    for pid, ctime in pins.items():
+        if ctime is not None and procs.create_time(pid) == ctime:
+            alive[pid] = ctime
+    return alive
+
+def _scan_tick(index: Matcher, pins: dict, last_full: float, procs) -> tuple[dict, float]:
+    """One tick of discovery for every target in `index`.
+
+    `pins` is {target: {pid: create_time}}. Pinned targets are re-checked by
+    PID every tick; one full pass (serving all targets) runs when nothing is
+    pinned, when a pinned target just lost its last PID, or when the
+    rediscovery interval for absent targets / new instances is up.
+    Returns (pins, last_full_scan_time).
+    """
+    t0 = time.perf_counter()
+    now = time.monotonic()
+    examined = 0
+    every_pinned = len(pins) == len(index.targets)
+    rediscover = REDISCOVER_INTERVAL if every_pinned else ABSENT_REDISCOVER_INTERVAL
+    if pins and now - last_full < rediscover:
+        alive = {}
+        for t, p in pins.items():
+            examined += len(p)
+            p = _check_pins(p, procs)
+            if p:
+                alive[t] = p
+        need_full = len(alive) < len(pins)   # a pinned target exited: another instance?
+        pins = alive
+        SCAN_STATS["pin_checks"] += 1
+    else:
+        need_full = True
+    if need_full:
+        try:
+            pins, n = _full_scan(index, procs)
+        except Exception:
+            pins, n = {}, 0
+        examined += n
+        last_full = now
+        SCAN_STATS["full_scans"] += 1
+
+    SCAN_STATS["ticks"] += 1
+    SCAN_STATS["procs_examined"] += examined
+    SCAN_STATS["last_tick_procs"] = examined
+    SCAN_STATS["last_tick_ms"] = (time.perf_counter() - t0) * 1000.0
+    return pins, last_full
+
+# ---------------- chance awards ----------------
+def award_chances(n: int, rolls_per_multi: int = 10, counter=None) -> tuple[int, int]:
+    """Add n chances in one write; return (balance, milestones crossed).
+
+    A milestone is every multiple of `rolls_per_multi` passed on the way
+    from the old balance to the new one, so a 500-chance catch-up costs
+    the same as a single award.
+    """
+    counter = counter or get_chances()
+    n = int(n)
+    if n <= 0:
+        return counter.value, 0
+    balance = counter.add(n)
+    rpm = max(1, int(rolls_per_multi))
+    return balance, balance // rpm - (balance - n) // rpm
+
+# ---------------- live control ----------------
+class TrackerControl:
+    """Thread-safe channel into a running run_tracker().
+
+    Setters only record the latest value and wake the loop; the tracker
+    applies them between ticks, keeping its carry-over state, so nothing
+    joins or restarts a thread. Stop through stop() so the loop wakes at once.
+    """
+
+    def __init__(self, stop_event=None):
+        self.stop_event = stop_event or threading.Event()
+        self.paused = False
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self.on_wake = None   # e.g. Job.run_soon when the tracker is a scheduler job
+        self.config = {}   # latest requested values, for callers to read back
+
+    def _poke(self) -> None:
+        self._wake.set()
+        if self.on_wake is not None:
+            try:
+                self.on_wake()
+            except Exception:
+                pass
+
+    def _put(self, key, value) -> None:
+        with self._lock:
+            self._pending[key] = value
+            self.config[key] = value
+        self._poke()
+
+    def set_rolls_per_multi(self, n: int) -> None:
+        self._put("rolls_per_multi", max(1, int(n)))
+
+    def set_time_required(self, seconds) -> None:
+        self._put("time_required", TIME_REQUIRED if seconds is None else max(1, int(seconds)))
+
+    def set_targets(self, targets) -> None:
+        self._put("targets", list(targets))
+
+    def set_paused(self, flag: bool) -> None:
+        self.paused = bool(flag)
+        self._poke()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self._poke()
+
+    def take(self) -> dict:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def sleep(self, seconds: float) -> bool:
+        """Wait up to `seconds` or until poked; True if stopping."""
+        self._wake.wait(seconds)
+        self._wake.clear()
+        return self.stop_event.is_set()
+
+# ---------------- main loop ----------------
+class Tracker:
+    """State of one tracking session; step() runs a single tick.
+
+    run_tracker() drives it from a dedicated thread; schedule_tracker()
+    runs step() as a job on the shared scheduler instead, so tracking
+    needs no thread of its own. Callbacks run on whichever thread calls
+    step().
+    """
+
+    def __init__(self, targets, *, is_paused=None, time_required=None, rolls_per_multi: int = 10,
+                 on_tick=None, on_chance=None, procs=None, control: TrackerControl | None = None,
+                 journal=None):
+        self.is_paused = is_paused or (lambda: False)
+        self.time_required = TIME_REQUIRED if time_required is None else time_required
+        try:
+            self.rolls_per_multi = max(1, int(rolls_per_multi))
+        except Exception:
+            self.rolls_per_multi = 10
+        self.on_tick, self.on_chance = on_tick, on_chance
+        self.procs = procs if procs is not None else get_process_backend()
+        self.control = control
+
+        self.chances, self.progress = get_chances(), get_progress()
+        self.m = _metrics_mod.tracker_metrics()   # None unless DOPAMINE_METRICS is set
+        self._ui_time = 0.0                       # callback time within the tick (metrics only)
+
+        self.targets = list(dict.fromkeys(t for t in targets if t))  # dedupe, keep order
+        self.tracked = {t: self.progress.get(t) for t in self.targets}
+        self.total_tracked_time = sum(self.tracked.values())
+        self.index = _build_index(self.targets)
+        self.pins, self.last_full = {}, 0.0
+        self.last_seen = {}       # target -> monotonic time of last positive scan
+        self.interval = MIN_SCAN_INTERVAL
+
+        # Session journal: start/stop, one begin/end pair per run of a target, awards
+        self.journal = journal if journal is not None else get_journal()
+        self._open = {}           # target -> [wall-clock begin, seconds credited since]
+        if self.journal:
+            self.journal.append("start", targets=self.targets)
+
+        # Show carry-over immediately
+        self._emit(on_tick, int(self.total_tracked_time))
+
+    def _emit(self, cb, *args):
+        if cb:
+            t = time.perf_counter() if self.m else 0.0
+            try:
+                cb(*args)
+            except Exception:
+                pass
+            if self.m:
+                self._ui_time += time.perf_counter() - t
+
+    def _begin(self, target) -> None:
+        if self.journal:
+            self._open[target] = [time.time(), 0.0]
+            self.journal.append("begin", exe=target)
+
+    def _end(self, target) -> None:
+        iv = self._open.pop(target, None)
+        if iv is not None:
+            self.journal.append("end", exe=target, since=round(iv[0], 3), s=round(iv[1], 3))
+
+    def _apply_changes(self, changes: dict) -> None:
+        if "rolls_per_multi" in changes:
+            self.rolls_per_multi = changes["rolls_per_multi"]
+        if "time_required" in changes:
+            self.time_required = changes["time_required"]
+        if "targets" in changes:
+            new = list(dict.fromkeys(t for t in changes["targets"] if t))
+            if new != self.targets:
+                tracked = self.tracked
+                self.progress.update(tracked)   # keep dropped targets' seconds
+                self.targets = new
+                self.tracked = tracked = {t: tracked[t] if t in tracked else self.progress.get(t)
+                                          for t in new}
+                self.pins = {t: p for t, p in self.pins.items() if t in tracked}
+                self.last_seen = {t: s for t, s in self.last_seen.items() if t in tracked}
+                for t in [t for t in self._open if t not in tracked]:
+                    self._end(t)
+                self.index, self.last_full = _build_index(new), 0.0   # rescan for new ones
+                self.total_tracked_time = sum(tracked.values())  # as a fresh start would show
+                self._emit(self.on_tick, int(self.total_tracked_time))
+        self.interval = MIN_SCAN_INTERVAL
+
+    def step(self) -> float:
+        """One tick: scan, credit, award, persist. Returns seconds until the next."""
+        control, m = self.control, self.m
+        if control is not None:
+            changes = control.take()
+            if changes:
+                self._apply_changes(changes)
+
+        if self.is_paused() or (control is not None and control.paused):
+            self.last_seen.clear()  # paused time is never credited
+            for t in list(self._open):
+                self._end(t)
+            self.interval = MIN_SCAN_INTERVAL
+            # control.set_paused(False) wakes the loop / job, so only a bare
+            # is_paused callback needs polling
+            return MIN_SCAN_INTERVAL if control is None else MAX_ABSENT_INTERVAL
+
+        clock = time.perf_counter
+        tracked, last_seen, progress = self.tracked, self.last_seen, self.progress
+
+        # Which targets are running? (pinned PIDs first, full scan as fallback)
+        if m:
+            t_tick = clock()
+            self._ui_time = 0.0
+            full_before = SCAN_STATS["full_scans"]
+        prev_running = set(self.pins)
+        self.pins, self.last_full = pins, _ = _scan_tick(self.index, self.pins, self.last_full, self.procs)
+        now = time.monotonic()
+        if m:
+            t_scan = clock()
+            m.scan.observe(t_scan - t_tick)
+            m.scans.inc()
+            m.full_scans.inc(SCAN_STATS["full_scans"] - full_before)
+            m.procs.inc(SCAN_STATS["last_tick_procs"])
+            m.matches.inc(len(pins))
+
+        awarded = False
+        if pins:
+            for target in pins:
+                seen = last_seen.get(target)
+                last_seen[target] = now
+                if seen is None:
+                    self._begin(target)
+                    continue  # first sighting: credit starts from here
+                gap = now - seen
+                if gap > MAX_CREDIT_GAP:
+                    continue  # machine was suspended; don't credit the gap
+                tracked[target] += gap
+                self.total_tracked_time += gap
+                iv = self._open.get(target)
+                if iv is not None:
+                    iv[1] += gap
+
+            self._emit(self.on_tick, int(self.total_tracked_time))
+
+            # Convert tracked seconds -> chances (per target), awarded in one write
+            t_award = clock() if m else 0.0
+            earned = 0
+            for target in pins:
+                if tracked[target] >= self.time_required:
+                    k = int(tracked[target] // self.time_required)
+                    tracked[target] -= k * self.time_required
+                    earned += k
+            if earned:
+                try:
+                    balance, milestones = award_chances(earned, self.rolls_per_multi, self.chances)
+                except Exception:
+                    balance, milestones = self.chances.value, 0
+                awarded = True
+                if self.journal:
+                    self.journal.append("award", n=earned, balance=balance, milestones=milestones)
+                if m:
+                    m.chances.inc(earned)
+                    m.award.observe(clock() - t_award)
+                self._emit(self.on_chance, balance, milestones, earned)
+
+        for target in prev_running - set(pins):
+            last_seen.pop(target, None)  # stopped: next sighting starts fresh
+            self._end(target)
+
+        if m:
+            t_save, writes_before = clock(), progress.writes
+        progress.update(tracked)
+        if awarded:
+            # the chance balance already moved; keep the carry-over in step with it
+            progress.flush()
+        else:
+            progress.maybe_flush()
+        if m:
+            t_end = clock()
+            m.save.observe(t_end - t_save)
+            m.writes.inc(progress.writes - writes_before)
+            m.ui.observe(self._ui_time)
+            m.tick.observe(t_end - t_tick)
+
+        self.interval = _next_interval(self.interval, set(pins) != prev_running, bool(pins))
+        return self.interval
+
+    def close(self) -> None:
+        """Stop/close: persist pending seconds, end the journal session."""
+        self.progress.flush()
+        if self.journal:
+            for t in list(self._open):
+                self._end(t)
+            self.journal.append("stop")
+            self.journal.flush()
+
+
+def run_tracker(
+    targets,
+    *,
+    stop_event=None,
+    is_paused=None,
+    time_required=None,
+    rolls_per_multi: int = 10,
+    on_tick=None,       # on_tick(total_seconds) whenever tracked time changes
+    on_chance=None,     # on_chance(balance, milestones, count) once per tick with awards
+    procs=None,
+    control: TrackerControl | None = None,
+):
+    """Credit time to every running target and convert it into chances.
+
+    Runs until `stop_event` is set. No UI here: callers react through
+    `on_tick` / `on_chance` (which run on this thread). Every running target
+    earns its own seconds, kept as separate carry-over entries in the
+    progress table; `on_tick` gets the combined tracked time. With a
+    `control`, targets / rolls_per_multi / time_required / pause can be
+    changed while it runs (and stop_event defaults to control.stop_event).
+    """
+    if stop_event is None:
+        stop_event = control.stop_event if control is not None else threading.Event()
+    tracker = Tracker(targets, is_paused=is_paused, time_required=time_required,
+                      rolls_per_multi=rolls_per_multi, on_tick=on_tick, on_chance=on_chance,
+                      procs=procs, control=control)
+    try:
+        while not stop_event.is_set():
+            delay = tracker.step()
+            # Responsive stop (don't hard-sleep a full interval)
+            if control is not None:
+                if control.sleep(delay):
+                    break
+            elif stop_event.wait(delay):
+                break
+    finally:
+        tracker.close()
+
+
+def schedule_tracker(targets, *, control: TrackerControl | None = None, scheduler=None, **kwargs):
+    """Run a Tracker as a job on the shared scheduler instead of its own thread.
+
+    Same keyword arguments as run_tracker(). Returns the Job; stop through
+    `control.stop()` (the job then flushes progress and ends, so
+    `job.wait()` returns once the carry-over is on disk).
+    """
+    from .scheduler import get_scheduler
+    control = control or TrackerControl()
+    targets = list(targets)
+    job, tracker = None, None
+
+    def tick():
+        nonlocal tracker
+        if tracker is None:   # built on the scheduler thread: progress loads off the caller
+            tracker = Tracker(targets, control=control, **kwargs)
+        if control.stop_event.is_set():
+            tracker.close()
+            job.cancel()
+            return None
+        return tracker.step()
+
+    job = (scheduler or get_scheduler()).every(MIN_SCAN_INTERVAL, tick, name="tracker", delay=0.0)
+    control.on_wake = job.run_soon    # settings / pause / stop apply at the next tick
+    if control.stop_event.is_set():
+        job.run_soon()
+    return job
@@ -0,0 +1,68 @@
+import itertools, threading, time
+
+# Worker threads never touch Tk: they post callables here and the UI thread
+# drains them from one periodic `after` pump. A message posted with a key
+# replaces the pending one with the same key (only the latest "Tracked Time"
+# matters), so a busy UI thread sees at most one update per key per frame.
+
+UI_QUEUE_SIZE = 256
+
+
+class UpdateQueue:
+    def __init__(self, maxsize: int = UI_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._pending = {}              # key -> (posted_at, fn), in post order
+        self._seq = itertools.count()   # keys for un-keyed messages
+        self._lock = threading.Lock()   # held only for dict insert / swap
+        self.stats = {
+            "posted": 0, "coalesced": 0, "dropped": 0, "drained": 0,
+            "max_depth": 0,
+            "last_latency_ms": 0.0,     # oldest message of the last drain
+            "max_latency_ms": 0.0,
+            "last_drain_ms": 0.0,       # time spent running the last batch
+        }
+
+    def post(self, fn, key=None) -> None:
+        """Queue `fn()` for the UI thread; same `key` -> only the latest runs."""
+        now = time.monotonic()
+        with self._lock:
+            st = self.stats
+            st["posted"] += 1
+            if key is None:
+                key = ("_", next(self._seq))
+            if key in self._pending:
+                del self._pending[key]   # re-insert at the end, keeps ordering
+                st["coalesced"] += 1
+            elif len(self._pending) >= self.maxsize:
+                del self._pending[next(iter(self._pending))]   # oldest goes
+                st["dropped"] += 1
+            self._pending[key] = (now, fn)
+            st["max_depth"] = max(st["max_depth"], len(self._pending))
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def drain(self) -> int:
+        """Run every pending message (UI thread only). Returns how many ran."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+        t0 = time.monotonic()
+        oldest = min(posted for posted, _ in batch.values())
+        for _, fn in batch.values():
+            try:
+                fn()
+            except Exception:
+                pass
+        st = self.stats
+        st["drained"] += len(batch)
+        st["last_latency_ms"] = (t0 - oldest) * 1000.0
+        st["max_latency_ms"] = max(st["max_latency_ms"], st["last_latency_ms"])
+        st["last_drain_ms"] = (time.monotonic() - t0) * 1000.0
+        return len(batch)
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["depth"] = self.depth()
+        return stats
@@ -0,0 +1,199 @@
+"""Toast notifications for the Tk UI: pooled windows, priorities, rate limit.
+
+A few Toplevels are built once and reused (withdraw / deiconify), so showing
+a notification is a label config plus a geometry call. Messages wait in a
+priority queue (jackpot > milestone > roll result > single chance).
+Bursts beyond `rate` shows per `per` seconds wait their turn. Jackpots skip
+the rate limit and may take over a toast showing something less important.
+
+Only chance and milestone messages are merged or dropped. A message with
+the same `key` as a waiting or visible one is merged into it. When the
+queue is full, the least important of them is dropped. Roll results are
+never lost: the user spent a chance on each one, so a preempted result is
+queued again and a full queue grows for them.
+"""
+import heapq, itertools, time
+import tkinter as tk
+
+JACKPOT, MILESTONE, ROLL, CHANCE = 0, 1, 2, 3
+MERGEABLE = (MILESTONE, CHANCE)   # may be merged or dropped; roll results never are
+
+
+class Ticket:
+    """One notification; update() retargets it whether queued or visible."""
+
+    def __init__(self, text, priority, ms, title, size, font, justify, sound, key):
+        self.text, self.priority, self.ms = text, priority, ms
+        self.title, self.size, self.key, self.sound = title, size, key, sound
+        self.label = {"font": font, "justify": justify}
+        self.toast = None      # the _Toast showing it, if any
+        self.done = False      # hidden, dropped or preempted
+
+    @property
+    def visible(self) -> bool:
+        return self.toast is not None and not self.done
+
+    def update(self, text=None, **label) -> None:
+        if text is not None:
+            self.text = text
+        self.label.update(label)
+        if self.visible:
+            self.toast.apply()
+
+
+class _Toast:
+    def __init__(self, manager, slot: int):
+        self.manager, self.slot = manager, slot
+        self.win = tk.Toplevel(manager.root)
+        self.win.withdraw()
+        self.win.resizable(False, False)
+        self.win.protocol("WM_DELETE_WINDOW", self.hide)   # closing returns it to the pool
+        self.label = tk.Label(self.win, text="")
+        self.label.pack(expand=True, fill="both")
+        self.ticket = None
+        self._timer = None
+
+    def show(self, ticket: Ticket) -> None:
+        self.ticket, ticket.toast = ticket, self
+        root = self.manager.root
+        w, h = ticket.size
+        x = root.winfo_x() + root.winfo_width() // 2 - w // 2
+        y = root.winfo_y() + root.winfo_height() // 2 - h // 2 + 24 * self.slot
+        self.win.title(ticket.title)
+        self.win.geometry(f"{w}x{h}+{x}+{y}")
+        self.apply()
+        self.win.deiconify()
+        self.win.lift()
+        self.restart_timer()
+        if ticket.sound:
+            ticket.sound()
+
+    def apply(self) -> None:
+        self.label.config(text=self.ticket.text, **self.ticket.label)
+
+    def restart_timer(self) -> None:
+        if self._timer is not None:
+            self.win.after_cancel(self._timer)
+        self._timer = self.win.after(self.ticket.ms, self.hide)
+
+    def hide(self) -> None:
+        if self._timer is not None:
+            try:
+                self.win.after_cancel(self._timer)
+            except Exception:
+                pass
+            self._timer = None
+        if self.ticket is not None:
+            self.ticket.done = True
+            self.ticket = None
+        self.win.withdraw()
+        self.manager._pump()
+
+
+class Notifier:
+    def __init__(self, root, *, pool_size: int = 3, rate: int = 4, per: float = 2.0,
+                 max_queue: int = 8):
+        self.root = root
+        self.pool_size, self.rate, self.per, self.max_queue = pool_size, rate, per, max_queue
+        self._pool = []
+        self._queue = []                  # (priority, seq, ticket)
+        self._seq = itertools.count()
+        self._shown_at = []               # monotonic times of recent shows
+        self._retry = None
+        self.stats = {"shown": 0, "merged": 0, "dropped": 0, "preempted": 0, "max_show_ms": 0.0}
+
+    def prebuild(self) -> None:
+        """Create the pooled windows now (e.g. after the first frame)."""
+        while len(self._pool) < self.pool_size:
+            self._pool.append(_Toast(self, len(self._pool)))
+
+    def notify(self, text, *, priority: int = ROLL, ms: int = 3000, title: str = "",
+               size=(400, 200), font=("Helvetica", 14), justify="center",
+               sound=None, key=None) -> Ticket:
+        """Queue a toast; same `key` as a pending/visible one -> merged into it."""
+        if key is not None and priority in MERGEABLE:
+            for t in self._live():
+                if t.key == key and t.priority in MERGEABLE:
+                    self.stats["merged"] += 1
+                    t.update(text, font=font, justify=justify)
+                    if t.visible:
+                        t.ms = max(t.ms, ms)
+                        t.toast.restart_timer()
+                    elif priority < t.priority:
+                        self._reprioritize(t, priority)
+                    t.priority = min(t.priority, priority)
+                    return t
+        ticket = Ticket(text, priority, ms, title, size, font, justify, sound, key)
+        heapq.heappush(self._queue, (priority, next(self._seq), ticket))
+        if len(self._queue) > self.max_queue:
+            droppable = [e for e in self._queue if e[0] in MERGEABLE]
+            if droppable:
+                worst = max(droppable)   # least important, newest
+                self._queue.remove(worst)
+                heapq.heapify(self._queue)
+                worst[2].done = True
+                self.stats["dropped"] += 1
+        self._pump()
+        return ticket
+
+    def _reprioritize(self, ticket: Ticket, priority: int) -> None:
+        # the heap orders by the entry tuple: replace it, then restore the invariant
+        for i, (_, seq, t) in enumerate(self._queue):
+            if t is ticket:
+                self._queue[i] = (priority, seq, ticket)
+                heapq.heapify(self._queue)
+                return
+
+    def clear(self) -> None:
+        for _, _, t in self._queue:
+            t.done = True
+        self._queue.clear()
+        for toast in self._pool:
+            if toast.ticket is not None:
+                toast.hide()
+
+    def _live(self):
+        for toast in self._pool:
+            if toast.ticket is not None:
+                yield toast.ticket
+        for _, _, t in self._queue:
+            yield t
+
+    def _tokens_left(self, now: float) -> int:
+        self._shown_at = [t for t in self._shown_at if now - t < self.per]
+        return self.rate - len(self._shown_at)
+
+    def _pump(self) -> None:
+        self.prebuild()
+        while self._queue:
+            priority, _, ticket = self._queue[0]
+            now = time.monotonic()
+            if priority != JACKPOT and self._tokens_left(now) <= 0:
+                if self._retry is None:
+                    wait = self.per - (now - self._shown_at[0])
+                    self._retry = self.root.after(max(1, int(wait * 1000)), self._retry_pump)
+                return
+            toast = next((t for t in self._pool if t.ticket is None), None)
+            if toast is None:
+                busy = max(self._pool, key=lambda t: t.ticket.priority)
+                if busy.ticket.priority <= priority:
+                    return   # everything on screen matters at least as much
+                self.stats["preempted"] += 1
+                old, busy.ticket = busy.ticket, None
+                if old.priority in MERGEABLE:
+                    old.done = True
+                else:   # a roll result: show it again once there is room
+                    old.toast, old.sound = None, None
+                    heapq.heappush(self._queue, (old.priority, next(self._seq), old))
+                toast = busy
+            heapq.heappop(self._queue)
+            t0 = time.perf_counter()
+            toast.show(ticket)
+            ms = (time.perf_counter() - t0) * 1000.0
+            self.stats["shown"] += 1
+            self.stats["max_show_ms"] = max(self.stats["max_show_ms"], ms)
+            self._shown_at.append(now)
+
+    def _retry_pump(self) -> None:
+        self._retry = None
+        self._pump()
@@ -0,0 +1,62 @@
+"""Startup-time profiler for the GUI entry point (`--profile-startup`).
+
+Stdlib only, so it can be installed before any heavy import. It records
+named phases (time since the previous mark) and every first-time import
+with its cumulative and self time.
+"""
+import builtins, sys, time
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._last = self.t0
+        self.phases = []     # (name, ms)
+        self.imports = []    # (name, cumulative ms, self ms, depth)
+        self._orig_import = None
+        self._stack = []     # child time accumulated per active import
+
+    # ---------------- phases ----------------
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000.0))
+        self._last = now
+
+    # ---------------- imports ----------------
+    def install(self) -> None:
+        if self._orig_import is None:
+            self._orig_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._orig_import is not None:
+            builtins.__import__ = self._orig_import
+            self._orig_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        orig = self._orig_import
+        if level or name in sys.modules:
+            return orig(name, globals, locals, fromlist, level)
+        depth = len(self._stack)
+        self._stack.append(0.0)
+        t = time.perf_counter()
+        try:
+            return orig(name, globals, locals, fromlist, level)
+        finally:
+            total = (time.perf_counter() - t) * 1000.0
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += total
+            self.imports.append((name, total, total - children, depth))
+
+    # ---------------- report ----------------
+    def report(self, top: int = 25) -> str:
+        total = (self._last - self.t0) * 1000.0
+        lines = [f"startup: {total:.1f} ms", "", "phases:"]
+        for name, ms in self.phases:
+            lines.append(f"  {ms:9.1f} ms  {name}")
+        lines += ["", f"imports (top {top} by cumulative time):",
+                  "   cumul ms    self ms  module"]
+        for name, cum, own, depth in sorted(self.imports, key=lambda r: -r[1])[:top]:
+            lines.append(f"  {cum:9.1f}  {own:9.1f}  {'  ' * depth}{name}")
+        return "\n".join(lines)